@@ -0,0 +1,186 @@
+"""
+Instrumentación del arranque.
+
+- LineaDeTiempo: marca cuándo ocurre cada paso (intérprete, imports, BD,
+  ventana, primer pintado, primera agenda) y lo anexa como una línea JSON
+  a data/arranque.jsonl. benchmark_arranque.py la usa para el presupuesto.
+- PerfilImportaciones: cuánto cuesta cargar cada módulo hasta que aparece
+  la ventana, para que una importación pesada nueva se note enseguida.
+
+Uso:  py main.py --perfil-imports      (o BARBERIA_PERFIL_IMPORTS=1)
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+OPCION = "--perfil-imports"
+VARIABLE_ENTORNO = "BARBERIA_PERFIL_IMPORTS"
+
+# Variables que usa benchmark_arranque.py al lanzar la app
+ENTORNO_T0 = "BARBERIA_T0"                       # time.time() de quien lanzó el proceso
+ENTORNO_TRAZA = "BARBERIA_TRAZA_ARRANQUE"        # archivo de traza alternativo
+ENTORNO_SALIR = "BARBERIA_SALIR_TRAS_ARRANQUE"   # "1": cerrar apenas termina el arranque
+
+PASOS = ("interprete", "imports", "db_init", "ventana_creada", "primer_pintado", "primera_agenda")
+TAMANO_MAXIMO_TRAZA = 256 * 1024
+
+
+class LineaDeTiempo:
+    """Momentos (ms desde el lanzamiento) de cada paso del arranque; se escribe una vez completa."""
+
+    def __init__(self):
+        self._t0_pared = time.time()
+        self._t0 = time.perf_counter()
+        lanzado = os.environ.get(ENTORNO_T0)
+        # Sin lanzador, el arranque del intérprete se aproxima con la importación de este módulo
+        self._desfase_ms = max((self._t0_pared - float(lanzado)) * 1000, 0.0) if lanzado else 0.0
+        self.pasos = {"interprete": self._desfase_ms}
+        self.al_completar = None
+        self._escrita = False
+
+    def marcar(self, paso):
+        """Registra el paso la primera vez que ocurre; las repeticiones se ignoran."""
+        if paso in self.pasos:
+            return
+        self.pasos[paso] = self._desfase_ms + (time.perf_counter() - self._t0) * 1000
+        if not self._escrita and all(p in self.pasos for p in PASOS):
+            self._escrita = True
+            self.escribir()
+            if self.al_completar:
+                self.al_completar()
+
+    def marcar_primer_pintado(self, ventana):
+        """Marca 'primer_pintado' cuando la ventana recibe su primer evento Paint."""
+        from PySide6.QtCore import QObject, QEvent
+
+        linea = self
+
+        class _Observador(QObject):
+            def eventFilter(self, objeto, evento):
+                if evento.type() == QEvent.Type.Paint:
+                    linea.marcar("primer_pintado")
+                    objeto.removeEventFilter(self)
+                return False
+
+        self._observador = _Observador(ventana)
+        ventana.installEventFilter(self._observador)
+
+    def ruta(self):
+        ruta = os.environ.get(ENTORNO_TRAZA)
+        if ruta:
+            return ruta
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(base_dir, "data", "arranque.jsonl")
+
+    def escribir(self):
+        ruta = self.ruta()
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            # La traza solo guarda los arranques recientes
+            modo = "w" if os.path.exists(ruta) and os.path.getsize(ruta) > TAMANO_MAXIMO_TRAZA else "a"
+            registro = {
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "lanzador": self._desfase_ms > 0,
+                "pasos": {paso: round(ms, 1) for paso, ms in self.pasos.items()},
+            }
+            with open(ruta, modo, encoding="utf-8") as archivo:
+                archivo.write(json.dumps(registro) + "\n")
+        except OSError as e:
+            print(f"No se pudo escribir la traza de arranque: {e}")
+
+
+linea_de_tiempo = LineaDeTiempo()
+
+
+class _CargadorMedido:
+    """Envuelve el loader real y cronometra exec_module."""
+
+    def __init__(self, perfil, nombre, cargador):
+        self._perfil = perfil
+        self._nombre = nombre
+        self._cargador = cargador
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargador, atributo)
+
+    def create_module(self, spec):
+        return self._cargador.create_module(spec)
+
+    def exec_module(self, modulo):
+        self._perfil._entrar(self._nombre)
+        try:
+            self._cargador.exec_module(modulo)
+        finally:
+            self._perfil._salir(self._nombre)
+
+
+class PerfilImportaciones:
+    """
+    Finder al frente de sys.meta_path que delega en los demás y mide cada
+    módulo: tiempo acumulado (con lo que importa) y propio (sin eso).
+    """
+
+    def __init__(self):
+        self._pila = []     # [(nombre, inicio, ms_de_hijos)]
+        self.medidas = {}   # nombre -> (propio_ms, acumulado_ms)
+        self._inicio = None
+        self.total_ms = 0.0
+
+    @classmethod
+    def si_se_pidio(cls, argv=None):
+        """Instala y retorna un perfil si se pidió por opción o variable de entorno; si no, None."""
+        argv = sys.argv if argv is None else argv
+        if OPCION not in argv and os.environ.get(VARIABLE_ENTORNO) != "1":
+            return None
+        perfil = cls()
+        perfil.iniciar()
+        return perfil
+
+    def iniciar(self):
+        self._inicio = time.perf_counter()
+        sys.meta_path.insert(0, self)
+
+    def detener(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+            self.total_ms = (time.perf_counter() - self._inicio) * 1000
+
+    # --- Protocolo de finder ---
+
+    def find_spec(self, nombre, ruta=None, objetivo=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(nombre, ruta, objetivo)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _CargadorMedido(self, nombre, spec.loader)
+                return spec
+        return None
+
+    def _entrar(self, nombre):
+        self._pila.append([nombre, time.perf_counter(), 0.0])
+
+    def _salir(self, nombre):
+        _, inicio, hijos_ms = self._pila.pop()
+        acumulado = (time.perf_counter() - inicio) * 1000
+        self.medidas[nombre] = (acumulado - hijos_ms, acumulado)
+        if self._pila:
+            self._pila[-1][2] += acumulado
+
+    # --- Reporte ---
+
+    def lineas(self, limite=25):
+        """Los `limite` módulos más caros por tiempo propio, más el total."""
+        ordenados = sorted(self.medidas.items(), key=lambda item: item[1][0], reverse=True)
+        lineas = [f"{'propio ms':>10} {'acum. ms':>10}  módulo"]
+        for nombre, (propio, acumulado) in ordenados[:limite]:
+            lineas.append(f"{propio:10.1f} {acumulado:10.1f}  {nombre}")
+        lineas.append(f"{len(self.medidas)} módulos importados en {self.total_ms:.0f} ms hasta la ventana")
+        return lineas
+
+    def imprimir(self, limite=25):
+        self.detener()
+        print("\n".join(self.lineas(limite)))
@@ -0,0 +1,112 @@
+"""
+Benchmark del arranque contra un presupuesto.
+
+Lanza la app varias veces (se cierra sola al completar el arranque), lee
+la línea de tiempo que escribe arranque.LineaDeTiempo y compara la mediana
+de cada paso con su presupuesto en ms, contados desde el lanzamiento.
+
+La app arranca sobre una copia temporal de la BD, así la migración y lo
+que escriba al iniciar no tocan el archivo real.
+
+Uso:  py benchmark_arranque.py [--corridas 5] [--presupuesto primer_pintado=1500 ...] [--bd RUTA]
+      (código de salida 1 si algún paso se pasa del presupuesto)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from arranque import ENTORNO_SALIR, ENTORNO_T0, ENTORNO_TRAZA, PASOS
+from database import ENTORNO_RUTA_BD, copiar_bd
+
+# Presupuestos por defecto (ms desde el lanzamiento), pensados para las máquinas de la recepción
+PRESUPUESTO_MS = {
+    "imports": 1200,
+    "db_init": 1400,
+    "primer_pintado": 2000,
+    "primera_agenda": 2500,
+}
+TIEMPO_LIMITE_S = 60
+
+
+def correr_una_vez(ruta_traza, ruta_bd):
+    """Lanza main.py sobre ruta_bd y retorna {paso: ms} de su línea de tiempo (None si no la escribió)."""
+    entorno = dict(os.environ)
+    entorno[ENTORNO_RUTA_BD] = ruta_bd
+    entorno[ENTORNO_TRAZA] = ruta_traza
+    entorno[ENTORNO_SALIR] = "1"
+    entorno[ENTORNO_T0] = repr(time.time())
+    main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    try:
+        subprocess.run([sys.executable, main], env=entorno, timeout=TIEMPO_LIMITE_S, check=False)
+    except subprocess.TimeoutExpired:
+        print(f"La app no terminó de arrancar en {TIEMPO_LIMITE_S} s.")
+        return None
+    if not os.path.exists(ruta_traza):
+        return None
+    with open(ruta_traza, encoding="utf-8") as archivo:
+        lineas = archivo.read().splitlines()
+    return json.loads(lineas[-1])["pasos"] if lineas else None
+
+
+def medir(corridas, origen_bd=None):
+    """{paso: [ms de cada corrida]}; la primera corrida (caché de disco fría, migraciones) no cuenta."""
+    medidas = {paso: [] for paso in PASOS}
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_bd = copiar_bd(os.path.join(carpeta, "barberia.db"), origen_bd)
+        for numero in range(corridas + 1):
+            pasos = correr_una_vez(os.path.join(carpeta, f"traza_{numero}.jsonl"), ruta_bd)
+            if pasos is None:
+                return None
+            if numero == 0:
+                continue
+            for paso, ms in pasos.items():
+                medidas.setdefault(paso, []).append(ms)
+    return medidas
+
+
+def _leer_presupuestos(pares):
+    presupuesto = dict(PRESUPUESTO_MS)
+    for par in pares or []:
+        paso, _, ms = par.partition("=")
+        if paso not in PASOS or not ms:
+            raise SystemExit(f"Presupuesto inválido: {par} (pasos: {', '.join(PASOS)})")
+        presupuesto[paso] = float(ms)
+    return presupuesto
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el arranque y lo compara con un presupuesto.")
+    parser.add_argument("--corridas", type=int, default=5)
+    parser.add_argument("--presupuesto", action="append", metavar="PASO=MS")
+    parser.add_argument("--bd", metavar="RUTA", help="BD a copiar (por defecto la de la app)")
+    args = parser.parse_args()
+    presupuesto = _leer_presupuestos(args.presupuesto)
+
+    medidas = medir(args.corridas, args.bd)
+    if medidas is None:
+        print("FALLO: la app no escribió su línea de tiempo.")
+        sys.exit(2)
+
+    excedidos = []
+    print(f"{'paso':<16} {'mediana ms':>10} {'máx ms':>8} {'presup.':>8}")
+    for paso in PASOS:
+        valores = medidas.get(paso)
+        if not valores:
+            continue
+        mediana = statistics.median(valores)
+        tope = presupuesto.get(paso)
+        marca = ""
+        if tope is not None and mediana > tope:
+            excedidos.append(paso)
+            marca = "  <-- EXCEDIDO"
+        print(f"{paso:<16} {mediana:10.0f} {max(valores):8.0f} {tope if tope is not None else '-':>8}{marca}")
+
+    if excedidos:
+        print(f"FALLO: fuera de presupuesto: {', '.join(excedidos)}")
+        sys.exit(1)
+    print("OK: arranque dentro del presupuesto.")
@@ -0,0 +1,93 @@
+"""
+Benchmark del parser del BCV sobre páginas guardadas (fixtures/bcv/).
+
+Para cada página compara el nivel rápido (HTMLParser en streaming) con el
+respaldo (BeautifulSoup): tiempo por página y pico de memoria. Además
+verifica que extraer_tasas() dé las tasas esperadas (fixtures/bcv/esperado.json).
+
+Uso:  py benchmark_bcv.py [--repeticiones 50]
+      (código de salida 1 si alguna página no da las tasas esperadas)
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from controllers.bcv_parser import extraer_tasas, extraer_tasas_rapido, extraer_tasas_soup
+
+CARPETA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bcv")
+
+
+def cronometrar(funcion, html, repeticiones):
+    """(mediana ms, pico KiB) de funcion(html)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(html)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tracemalloc.start()
+    funcion(html)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tiempos), pico / 1024
+
+
+def hay_bs4():
+    try:
+        import bs4  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _coinciden(obtenidas, esperadas):
+    return obtenidas.keys() == esperadas.keys() and all(
+        abs(obtenidas[moneda] - valor) < 1e-9 for moneda, valor in esperadas.items()
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara los niveles del parser del BCV.")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(os.path.join(CARPETA_FIXTURES, "esperado.json"), encoding="utf-8") as archivo:
+        esperado = json.load(archivo)
+    con_soup = hay_bs4()
+    if not con_soup:
+        print("(bs4 no está instalado: se omite el nivel de respaldo)")
+
+    fallos = []
+    print(f"{'página':<22} {'KiB':>5} {'rápido ms':>10} {'KiB pico':>9} {'soup ms':>9} {'KiB pico':>9}  monedas")
+    for nombre, tasas_esperadas in esperado.items():
+        with open(os.path.join(CARPETA_FIXTURES, nombre), "rb") as archivo:
+            html = archivo.read()
+
+        rapido_ms, rapido_kib = cronometrar(extraer_tasas_rapido, html, args.repeticiones)
+        soup_ms = soup_kib = None
+        if con_soup:
+            soup_ms, soup_kib = cronometrar(extraer_tasas_soup, html, max(args.repeticiones // 10, 1))
+
+        rapidas = extraer_tasas_rapido(html)
+        if con_soup or "USD" in rapidas:
+            try:
+                obtenidas = extraer_tasas(html)
+            except ValueError as e:
+                print(f"    {nombre}: {e}")
+                obtenidas = {}
+            if not _coinciden(obtenidas, tasas_esperadas):
+                fallos.append(nombre)
+
+        columnas_soup = f"{soup_ms:9.2f} {soup_kib:9.0f}" if con_soup else f"{'-':>9} {'-':>9}"
+        print(
+            f"{nombre:<22} {len(html) / 1024:5.0f} {rapido_ms:10.2f} {rapido_kib:9.0f} {columnas_soup}  "
+            f"{','.join(sorted(rapidas)) or '(respaldo)'}"
+        )
+
+    if fallos:
+        print(f"FALLO: tasas distintas a las esperadas en: {', '.join(fallos)}")
+        sys.exit(1)
+    print("OK: todas las páginas dan las tasas esperadas.")
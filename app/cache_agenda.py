@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+
+
+class CacheAgenda:
+    """
+    Citas de la agenda por fecha, en memoria.
+
+    Los controladores invalidan la fecha que tocan (después de confirmar).
+    Además, triggers sobre citas anotan cada fecha modificada en
+    agenda_cambios, de este proceso o de otro; antes de responder se leen
+    las anotaciones nuevas y se descartan solo esas fechas. PRAGMA
+    data_version, en una conexión propia, evita esa lectura mientras nadie
+    haya escrito en la BD.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._filas = {}
+        self._lock = threading.Lock()
+        self._generacion = 0  # Cambia con cada invalidación
+        self._vigilante = None
+        self._data_version = None
+        self._cambio = None  # Última versión de agenda_cambios ya aplicada
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, fecha, cargar):
+        """Filas de `fecha`; si no están, cargar() las trae de la BD."""
+        with self._lock:
+            self._revisar_cambios()
+            filas = self._filas.get(fecha)
+            if filas is not None:
+                self.aciertos += 1
+                return list(filas)
+            self.fallos += 1
+            generacion = self._generacion
+
+        filas = cargar()
+
+        with self._lock:
+            # Si hubo una invalidación mientras se cargaba, la lectura pudo ver datos viejos
+            if generacion == self._generacion:
+                self._filas[fecha] = tuple(filas)
+        return filas
+
+    def obtener_varias(self, fechas, cargar):
+        """{fecha: filas} de varias fechas; cargar(faltantes) trae las que falten en una sola ida a la BD.
+
+        cargar recibe la lista de fechas faltantes y retorna {fecha: filas}
+        para todas ellas (lista vacía si no hay citas ese día).
+        """
+        resultado = {}
+        with self._lock:
+            self._revisar_cambios()
+            for fecha in fechas:
+                filas = self._filas.get(fecha)
+                if filas is not None:
+                    resultado[fecha] = list(filas)
+            faltantes = [fecha for fecha in fechas if fecha not in resultado]
+            self.aciertos += len(resultado)
+            self.fallos += len(faltantes)
+            generacion = self._generacion
+        if not faltantes:
+            return resultado
+
+        cargadas = cargar(faltantes)
+
+        with self._lock:
+            guardar = generacion == self._generacion
+            for fecha in faltantes:
+                filas = cargadas.get(fecha, [])
+                if guardar:
+                    self._filas[fecha] = tuple(filas)
+                resultado[fecha] = list(filas)
+        return resultado
+
+    def en_cache(self, fecha):
+        """Filas de `fecha` si ya están (y siguen vigentes); None si no. No toca la BD."""
+        with self._lock:
+            self._revisar_cambios()
+            filas = self._filas.get(fecha)
+            if filas is None:
+                return None
+            self.aciertos += 1
+            return list(filas)
+
+    def invalidar(self, fecha):
+        with self._lock:
+            self._filas.pop(fecha, None)
+            self._generacion += 1
+
+    def limpiar(self):
+        """Descarta todas las fechas (p. ej. al renombrar un cliente o servicio)."""
+        with self._lock:
+            self._filas.clear()
+            self._generacion += 1
+
+    def cerrar(self):
+        with self._lock:
+            self._filas.clear()
+            if self._vigilante is not None:
+                try:
+                    self._vigilante.close()
+                except sqlite3.Error:
+                    pass
+                self._vigilante = None
+
+    def _revisar_cambios(self):
+        try:
+            if self._vigilante is None:
+                self._vigilante = sqlite3.connect(self.db.db_path, check_same_thread=False)
+            data_version = self._vigilante.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            if self._cambio is None:
+                # Primera revisión: el registro se sigue desde aquí
+                ultimo = self._vigilante.execute("SELECT max(version) FROM agenda_cambios").fetchone()[0]
+                self._descartar_todo(ultimo or 0)
+            else:
+                self._aplicar_cambios(self._vigilante.execute(
+                    "SELECT version, fecha FROM agenda_cambios WHERE version >= ? ORDER BY version",
+                    (self._cambio,),
+                ).fetchall())
+            self._data_version = data_version
+        except sqlite3.Error as e:
+            print(f"Error vigilando cambios de la agenda: {e}")
+            self._vigilante = None
+            self._data_version = None
+            self._descartar_todo(None)
+
+    def _aplicar_cambios(self, cambios):
+        nuevos = [(version, fecha) for version, fecha in cambios if version > self._cambio]
+        if not nuevos:
+            return
+        # Sin la última versión aplicada el registro ya se podó: pudo perderse algo
+        podado = self._cambio and cambios[0][0] != self._cambio
+        if podado or any(fecha is None for _, fecha in nuevos):
+            self._descartar_todo(nuevos[-1][0])
+            return
+        for _, fecha in nuevos:
+            self._filas.pop(fecha, None)
+        self._generacion += 1
+        self._cambio = nuevos[-1][0]
+
+    def _descartar_todo(self, cambio):
+        self._filas.clear()
+        self._generacion += 1
+        self._cambio = cambio
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def cache_agenda(db):
+    """Cache compartido por todos los controladores del mismo archivo de BD."""
+    with _caches_lock:
+        cache = _caches.get(db.db_path)
+        if cache is None:
+            cache = _caches[db.db_path] = CacheAgenda(db)
+        return cache
+
+
+def cerrar_caches():
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.cerrar()
+        _caches.clear()
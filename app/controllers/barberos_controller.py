@@ -13,16 +13,12 @@ class BarberosController:
 
     def obtener_barberos_activos(self):
         """Barberos activos ordenados para usar en combos."""
-        conn = self.db.get_connection()
-        if not conn: return []
+        with self.db.conexion() as conn:
+            if not conn: return []
         
-        try:
-            cursor = conn.cursor()
-            query = "SELECT id_barbero, nombre FROM barberos WHERE activo = 1 ORDER BY nombre ASC"
-            cursor.execute(query)
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error al obtener barberos: {e}")
-            return []
-        finally:
-            conn.close()
\ No newline at end of file
+            try:
+                query = "SELECT id_barbero, nombre FROM barberos WHERE activo = 1 ORDER BY nombre ASC"
+                return self.db.consultar(conn, "obtener_barberos_activos", query)
+            except Exception as e:
+                print(f"Error al obtener barberos: {e}")
+                return []
\ No newline at end of file
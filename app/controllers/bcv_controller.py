@@ -1,87 +1,88 @@
-import sys
-import re
-import requests
-from bs4 import BeautifulSoup
-from PySide6.QtCore import QThread, Signal
-import urllib3
-
-# Desactivar advertencias de SSL inseguro (necesario para BCV)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-
-def obtener_tasa():
-    """Obtiene la tasa USD del BCV con parsing tolerante a cambios de HTML."""
-    url = "https://www.bcv.org.ve/"
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/124.0.0.0 Safari/537.36"
-        )
-    }
-
-    try:
-        response = requests.get(url, headers=headers, verify=False, timeout=15)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # 1) Estructura clásica BCV
-        candidatos = [
-            soup.select_one('div#dolar strong'),
-            soup.select_one('#dolar strong'),
-            soup.select_one('div#dolar span'),
-            soup.select_one('#dolar'),
-            soup.select_one('div[id*="dolar" i] strong'),
-            soup.select_one('div[id*="dolar" i] span'),
-            soup.select_one('div[id*="dolar" i]'),
-        ]
-
-        texto_tasa = None
-        for nodo in candidatos:
-            if nodo:
-                valor = nodo.get_text(" ", strip=True)
-                if valor:
-                    texto_tasa = valor
-                    break
-
-        # 2) Fallback: buscar cualquier patrón numérico tipo "xx,xxxx"
-        if not texto_tasa:
-            match = re.search(r'(\d{1,3}(?:\.\d{3})*,\d+|\d+,\d+|\d+\.\d+)', soup.get_text(" ", strip=True))
-            if match:
-                texto_tasa = match.group(1)
-
-        if not texto_tasa:
-            raise ValueError("No se encontró el precio del dólar en el HTML del BCV")
-
-        # Limpiar texto: quitar Bs/espacios y normalizar decimal
-        tasa_limpia = texto_tasa
-        tasa_limpia = tasa_limpia.replace('Bs.', '').replace('Bs', '').replace('VES', '')
-        tasa_limpia = tasa_limpia.replace('\xa0', '').replace(' ', '').strip()
+import threading
 
-        if ',' in tasa_limpia and '.' in tasa_limpia:
-            tasa_limpia = tasa_limpia.replace('.', '').replace(',', '.')
-        else:
-            tasa_limpia = tasa_limpia.replace(',', '.')
-
-        match_num = re.search(r'\d+(?:\.\d+)?', tasa_limpia)
-        if not match_num:
-            raise ValueError(f"Formato de tasa inválido: {texto_tasa}")
+from PySide6.QtCore import QThread, Signal
 
-        return float(match_num.group(0))
+from controllers.cliente_bcv import ClienteBCV, espera_exponencial
+from controllers.tasa_controller import TasaController
 
-    except Exception as e:
-        print(f"[BCV] Error real al obtener tasa: {e}")
-        raise
 
-class BCVWorker(QThread):
-    """Hilo de scraping del BCV sin congelar la UI."""
-    precio_actualizado = Signal(float)
+class ServicioTasaBCV(QThread):
+    """
+    Hilo de larga vida que mantiene al día las tasas BCV: consulta cuando
+    vence la tasa guardada (configuracion 'tasa_bcv_ttl_min'), la guarda y
+    avisa la de USD. Si una ronda falla entera vuelve a intentar con
+    espera exponencial en vez de esperar el intervalo completo.
+    """
+    precio_actualizado = Signal(float)   # USD de cada consulta buena
     error_ocurrido = Signal(str)
 
+    ESPERA_MINIMA_S = 30
+    ESPERA_TRAS_FALLO_MAXIMA_S = 15 * 60
+
+    def __init__(self, url=None, parent=None):
+        super().__init__(parent)
+        self.url = url
+        self._detener = threading.Event()
+        self._ahora = threading.Event()
+        self._cliente = None
+
+    def actualizar_ahora(self):
+        """Adelanta la próxima consulta (p. ej. un botón de refrescar)."""
+        self._ahora.set()
+
+    def detener(self):
+        """
+        Corta las esperas y bloquea hasta que el hilo termine. Una consulta
+        en curso no se puede interrumpir, pero ClienteBCV.TIMEOUT_S la acota
+        y los reintentos ven la orden antes de volver a la red. Destruir el
+        QThread corriendo aborta el proceso, por eso no hay tiempo límite.
+        """
+        self._detener.set()
+        self._ahora.set()
+        cliente = self._cliente
+        if cliente is not None:
+            cliente.cerrar()
+        self.wait()
+
     def run(self):
+        controller = TasaController()
+        cliente = self._cliente = ClienteBCV(self.url, dormir=self._dormir)
+        fallos_seguidos = 0
+        consultada = False
         try:
-            tasa = obtener_tasa()
-            self.precio_actualizado.emit(tasa)
-        except Exception as e:
-            self.error_ocurrido.emit(f"Fallo conexión: {str(e)}")
\ No newline at end of file
+            while not self._detener.is_set():
+                if fallos_seguidos:
+                    espera = self.ESPERA_MINIMA_S + espera_exponencial(
+                        fallos_seguidos, self.ESPERA_MINIMA_S, self.ESPERA_TRAS_FALLO_MAXIMA_S
+                    )
+                else:
+                    espera = controller.segundos_para_vencer()
+                    if consultada:
+                        # Con una vigencia mínima (o sin BD) no se martilla al BCV
+                        espera = max(espera, self.ESPERA_MINIMA_S)
+                self._esperar(espera)
+                if self._detener.is_set():
+                    break
+                try:
+                    tasas = cliente.obtener_tasas()
+                except Exception as e:
+                    if self._detener.is_set():
+                        break
+                    fallos_seguidos += 1
+                    self.error_ocurrido.emit(f"Fallo conexión: {str(e)}")
+                    continue
+                fallos_seguidos = 0
+                consultada = True
+                for moneda, valor in tasas.items():
+                    controller.guardar_tasa(valor, moneda)
+                self.precio_actualizado.emit(tasas["USD"])
+        finally:
+            cliente.cerrar()
+
+    def _esperar(self, segundos):
+        self._ahora.wait(max(segundos, 0))
+        self._ahora.clear()
+
+    def _dormir(self, segundos):
+        # Entre reintentos: una orden de detener corta la espera
+        return self._detener.wait(segundos)
@@ -0,0 +1,163 @@
+"""
+Extracción de tasas de la página del BCV, por niveles.
+
+1) Rápido: salta directo al primer <div id="dolar|euro|yuan|lira|rublo">
+   y desde ahí un HTMLParser en streaming lee solo esos bloques; deja de
+   leer cuando ya los vio todos. No arma árbol.
+2) Respaldo: BeautifulSoup con los selectores tolerantes de siempre y, en
+   último caso, una regex sobre el texto. bs4 se importa solo si hace falta.
+
+Ver benchmark_bcv.py y fixtures/bcv/ para comparar ambos niveles.
+"""
+import re
+from html.parser import HTMLParser
+
+# id del bloque en la página -> código de moneda
+MONEDAS_BCV = {
+    "dolar": "USD",
+    "euro": "EUR",
+    "yuan": "CNY",
+    "lira": "TRY",
+    "rublo": "RUB",
+}
+TAMANO_TROZO = 8192
+_INICIO_BLOQUES = re.compile(
+    r'<div\b[^>]*\bid\s*=\s*["\']?\s*(?:' + "|".join(MONEDAS_BCV) + r')\b', re.IGNORECASE
+)
+
+
+def normalizar_tasa(texto):
+    """'36,50830000' / 'Bs. 1.234,56' -> float."""
+    tasa_limpia = texto.replace('Bs.', '').replace('Bs', '').replace('VES', '')
+    tasa_limpia = tasa_limpia.replace('\xa0', '').replace(' ', '').strip()
+
+    if ',' in tasa_limpia and '.' in tasa_limpia:
+        tasa_limpia = tasa_limpia.replace('.', '').replace(',', '.')
+    else:
+        tasa_limpia = tasa_limpia.replace(',', '.')
+
+    match_num = re.search(r'\d+(?:\.\d+)?', tasa_limpia)
+    if not match_num:
+        raise ValueError(f"Formato de tasa inválido: {texto}")
+    return float(match_num.group(0))
+
+
+class _ExtractorTasas(HTMLParser):
+    """Junta el texto de <strong> (o, si no hay, todo el texto) dentro de cada bloque de moneda."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.textos = {}        # moneda -> texto del valor
+        self._moneda = None     # bloque abierto
+        self._profundidad = 0   # <div> abiertos dentro del bloque
+        self._en_strong = False
+        self._strong = []
+        self._todo = []
+
+    def completo(self):
+        return len(self.textos) == len(MONEDAS_BCV)
+
+    def handle_starttag(self, tag, attrs):
+        if self._moneda is None:
+            if tag == "div":
+                moneda = MONEDAS_BCV.get((dict(attrs).get("id") or "").strip().lower())
+                if moneda and moneda not in self.textos:
+                    self._moneda = moneda
+                    self._profundidad = 1
+                    self._strong, self._todo = [], []
+            return
+        if tag == "div":
+            self._profundidad += 1
+        elif tag == "strong":
+            self._en_strong = True
+
+    def handle_endtag(self, tag):
+        if self._moneda is None:
+            return
+        if tag == "strong":
+            self._en_strong = False
+        elif tag == "div":
+            self._profundidad -= 1
+            if self._profundidad == 0:
+                texto = "".join(self._strong).strip() or " ".join(self._todo)
+                if texto:
+                    self.textos[self._moneda] = texto
+                self._moneda = None
+
+    def handle_data(self, data):
+        if self._moneda is None:
+            return
+        if self._en_strong:
+            self._strong.append(data)
+        elif data.strip():
+            self._todo.append(data.strip())
+
+
+def _a_texto(html):
+    if isinstance(html, bytes):
+        return html.decode("utf-8", errors="replace")
+    return html
+
+
+def extraer_tasas_rapido(html):
+    """Nivel 1: {moneda: tasa} de los bloques encontrados (puede faltar alguna)."""
+    html = _a_texto(html)
+    primero = _INICIO_BLOQUES.search(html)
+    if not primero:
+        return {}
+    extractor = _ExtractorTasas()
+    for inicio in range(primero.start(), len(html), TAMANO_TROZO):
+        extractor.feed(html[inicio:inicio + TAMANO_TROZO])
+        if extractor.completo():
+            break
+    tasas = {}
+    for moneda, texto in extractor.textos.items():
+        try:
+            tasas[moneda] = normalizar_tasa(texto)
+        except ValueError:
+            pass
+    return tasas
+
+
+def extraer_tasas_soup(html):
+    """Nivel 2: BeautifulSoup con selectores tolerantes; el USD cae a una regex si no aparece."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    tasas = {}
+    for id_bloque, moneda in MONEDAS_BCV.items():
+        candidatos = [
+            soup.select_one(f'div#{id_bloque} strong'),
+            soup.select_one(f'#{id_bloque} strong'),
+            soup.select_one(f'div#{id_bloque} span'),
+            soup.select_one(f'#{id_bloque}'),
+            soup.select_one(f'div[id*="{id_bloque}" i] strong'),
+            soup.select_one(f'div[id*="{id_bloque}" i] span'),
+            soup.select_one(f'div[id*="{id_bloque}" i]'),
+        ]
+        for nodo in candidatos:
+            valor = nodo.get_text(" ", strip=True) if nodo else ""
+            if not valor:
+                continue
+            try:
+                tasas[moneda] = normalizar_tasa(valor)
+                break
+            except ValueError:
+                continue
+
+    # Fallback: buscar cualquier patrón numérico tipo "xx,xxxx"
+    if "USD" not in tasas:
+        match = re.search(r'(\d{1,3}(?:\.\d{3})*,\d+|\d+,\d+|\d+\.\d+)', soup.get_text(" ", strip=True))
+        if match:
+            tasas["USD"] = normalizar_tasa(match.group(1))
+    return tasas
+
+
+def extraer_tasas(html):
+    """{moneda: tasa} de la página del BCV; el USD es obligatorio (ValueError si no aparece)."""
+    tasas = extraer_tasas_rapido(html)
+    if "USD" not in tasas:
+        tasas = {**extraer_tasas_soup(html), **tasas}
+    if "USD" not in tasas:
+        raise ValueError("No se encontró el precio del dólar en el HTML del BCV")
+    return tasas
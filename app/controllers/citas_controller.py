@@ -1,186 +1,411 @@
 import sys
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 # Ajuste de path para importar database correctamente
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import DatabaseManager
+from cache_agenda import cache_agenda
+
+MINUTOS_DIA = 24 * 60
+
+
+def a_minutos(hora_str):
+    """'HH:MM' -> minutos desde la medianoche."""
+    horas, minutos = hora_str.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+def a_hora(minutos):
+    """Minutos desde la medianoche -> 'HH:MM' (pasada la medianoche, vuelve a 00:00)."""
+    minutos %= MINUTOS_DIA
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def intervalo_minutos(hora_inicio, hora_fin):
+    """('HH:MM', 'HH:MM') -> (inicio, fin) en minutos; si fin < inicio, la cita cruza la medianoche.
+
+    fin == inicio es una cita sin duración (servicio de 0 minutos) y no
+    ocupa tiempo, igual que antes con la comparación de horas.
+    """
+    inicio = a_minutos(hora_inicio)
+    fin = a_minutos(hora_fin)
+    if fin < inicio:
+        fin += MINUTOS_DIA
+    return inicio, fin
+
+
+def _dia_vecino(fecha_str, dias):
+    return (date.fromisoformat(fecha_str) + timedelta(days=dias)).isoformat()
+
+
+# Solape contra el mismo barbero en minutos enteros (minuto_fin puede pasar de 1440).
+# Cubre también la cita del día anterior que se extiende tras la medianoche y,
+# si la nueva cruza la medianoche, las del día siguiente.
+# Parámetros: id_barbero, fecha, fin, inicio, dia_anterior, inicio + 1440, dia_siguiente, fin - 1440
+_CONDICION_SOLAPE = """
+    id_barbero = ? AND estado != 'Cancelada' AND (
+        (fecha = ? AND minuto_inicio < ? AND minuto_fin > ?)
+        OR (fecha = ? AND minuto_fin > ?)
+        OR (fecha = ? AND minuto_inicio < ?)
+    )
+"""
+
+
+def _parametros_solape(id_barbero, fecha, inicio, fin):
+    return (
+        id_barbero, fecha, fin, inicio,
+        _dia_vecino(fecha, -1), inicio + MINUTOS_DIA,
+        _dia_vecino(fecha, 1), fin - MINUTOS_DIA,
+    )
+
+
+class ResultadoReserva:
+    """Resultado de agendar_cita: estado, id de la cita creada o en conflicto, y mensaje."""
+    AGENDADA = "agendada"
+    CONFLICTO = "conflicto"
+    ERROR = "error"
+
+    def __init__(self, estado, id_cita=None, mensaje=""):
+        self.estado = estado
+        self.id_cita = id_cita
+        self.mensaje = mensaje
+
+    @property
+    def agendada(self):
+        return self.estado == self.AGENDADA
+
+    @property
+    def conflicto(self):
+        return self.estado == self.CONFLICTO
+
+    def __repr__(self):
+        return f"ResultadoReserva({self.estado!r}, id_cita={self.id_cita!r})"
+
 
 class CitasController:
     """Gestiona citas con soporte multi-barbero."""
 
     def __init__(self):
         self.db = DatabaseManager()
+        self.agenda = cache_agenda(self.db)
 
-    def obtener_clientes(self):
-        conn = self.db.get_connection()
-        if not conn: return []
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_cliente, nombre FROM clientes ORDER BY nombre ASC")
-            return cursor.fetchall()
-        finally:
-            conn.close()
+    def _invalidar_agenda(self, conn, fecha):
+        """Saca `fecha` del cache de agenda cuando la escritura quede confirmada."""
+        self.db.tras_confirmar(conn, lambda: self.agenda.invalidar(fecha))
 
     def obtener_servicios_activos(self):
-        conn = self.db.get_connection()
-        if not conn: return []
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_servicio, nombre, precio, duracion_minutos FROM servicios WHERE activo = 1 ORDER BY nombre ASC")
-            return cursor.fetchall()
-        finally:
-            conn.close()
+        with self.db.conexion() as conn:
+            if not conn: return []
+            return self.db.consultar(
+                conn, "obtener_servicios_activos",
+                "SELECT id_servicio, nombre, precio, duracion_minutos FROM servicios WHERE activo = 1 ORDER BY nombre ASC",
+            )
 
     def get_hora_actual_formateada(self):
         return datetime.now().strftime("%H:%M")
 
     def calcular_hora_fin(self, hora_inicio_str, duracion_minutos):
         try:
-            formato = "%H:%M"
-            inicio_dt = datetime.strptime(hora_inicio_str, formato)
-            fin_dt = inicio_dt + timedelta(minutes=int(duracion_minutos))
-            return fin_dt.strftime(formato)
+            return a_hora(a_minutos(hora_inicio_str) + int(duracion_minutos))
         except Exception:
             return hora_inicio_str
 
     def hay_solapamiento(self, fecha_str, hora_inicio, hora_fin, id_barbero):
         """Valida solapes solo contra el mismo barbero; otros pueden seguir."""
-        conn = self.db.get_connection()
-        if not conn: return True
+        with self.db.conexion() as conn:
+            if not conn: return True
 
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT hora_inicio, hora_fin 
-                FROM citas 
-                WHERE fecha = ? 
-                  AND id_barbero = ? 
-                  AND estado != 'Cancelada'
-            """
-            cursor.execute(query, (fecha_str, id_barbero))
-            citas_existentes = cursor.fetchall()
-
-            for inicio_existente, fin_existente in citas_existentes:
-                if (hora_inicio < fin_existente) and (hora_fin > inicio_existente):
-                    return True  # Conflicto para este barbero
-            return False
-        except Exception as e:
-            print(f"Error verificando solapamiento: {e}")
-            return True
-        finally:
-            conn.close()
+            try:
+                inicio, fin = intervalo_minutos(hora_inicio, hora_fin)
+                query = f"SELECT EXISTS (SELECT 1 FROM citas WHERE {_CONDICION_SOLAPE})"
+                fila = self.db.consultar(
+                    conn, "hay_solapamiento", query, _parametros_solape(id_barbero, fecha_str, inicio, fin), uno=True
+                )
+                return bool(fila[0])
+            except Exception as e:
+                print(f"Error verificando solapamiento: {e}")
+                return True
 
     def obtener_o_crear_cliente_publico(self):
-        conn = self.db.get_connection()
-        if not conn: return None
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_cliente FROM clientes WHERE nombre = 'Público General'")
-            resultado = cursor.fetchone()
+        with self.db.conexion() as conn:
+            if not conn: return None
+            resultado = self.db.consultar(
+                conn, "buscar_cliente_publico",
+                "SELECT id_cliente FROM clientes WHERE nombre = 'Público General'", uno=True,
+            )
             if resultado: return resultado[0]
             
-            cursor.execute("INSERT INTO clientes (nombre) VALUES ('Público General')")
-            conn.commit()
+            cursor = self.db.ejecutar(conn, "crear_cliente_publico", "INSERT INTO clientes (nombre) VALUES ('Público General')")
+            self.db.confirmar(conn)
             return cursor.lastrowid
-        finally:
-            conn.close()
 
     def crear_cita(self, id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin, total, notas=""):
         """Inserta nueva cita asociándola a un barbero."""
-        conn = self.db.get_connection()
-        if not conn: return False
+        with self.db.conexion() as conn:
+            if not conn: return False
 
+            try:
+                inicio, fin = intervalo_minutos(hora_inicio, hora_fin)
+                query = """
+                    INSERT INTO citas (id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin,
+                                       minuto_inicio, minuto_fin, total_estimado, estado, notas)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'Pendiente', ?)
+                """
+                self.db.ejecutar(conn, "crear_cita", query, (
+                    id_cliente, id_servicio, id_barbero, fecha, a_hora(inicio), a_hora(fin), inicio, fin, total, notas,
+                ))
+                self.db.confirmar(conn)
+                self._invalidar_agenda(conn, fecha)
+                return True
+            except Exception as e:
+                self.db.revertir(conn)
+                print(f"Error creando cita: {e}")
+                return False
+
+    def agendar_cita(self, id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin, total, notas=""):
+        """Verifica solape e inserta en un solo INSERT ... WHERE NOT EXISTS bajo BEGIN IMMEDIATE.
+
+        Retorna ResultadoReserva: AGENDADA (id nuevo), CONFLICTO (id de la
+        cita que choca) o ERROR.
+        """
         try:
-            cursor = conn.cursor()
-            query = """
-                INSERT INTO citas (id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin, total_estimado, estado, notas)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 'Pendiente', ?)
-            """
-            cursor.execute(query, (id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin, total, notas))
-            conn.commit()
-            return True
+            with self.db.unidad_de_trabajo() as conn:
+                if not conn: return ResultadoReserva(ResultadoReserva.ERROR, mensaje="Error de conexión.")
+
+                inicio, fin = intervalo_minutos(hora_inicio, hora_fin)
+                solape = _parametros_solape(id_barbero, fecha, inicio, fin)
+                query = f"""
+                    INSERT INTO citas (id_cliente, id_servicio, id_barbero, fecha, hora_inicio, hora_fin,
+                                       minuto_inicio, minuto_fin, total_estimado, estado, notas)
+                    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, 'Pendiente', ?
+                    WHERE NOT EXISTS (SELECT 1 FROM citas WHERE {_CONDICION_SOLAPE})
+                """
+                cursor = self.db.ejecutar(conn, "agendar_cita", query, (
+                    id_cliente, id_servicio, id_barbero, fecha, a_hora(inicio), a_hora(fin), inicio, fin, total, notas,
+                ) + solape)
+                if cursor.rowcount == 1:
+                    self._invalidar_agenda(conn, fecha)
+                    return ResultadoReserva(ResultadoReserva.AGENDADA, cursor.lastrowid, "Cita agendada.")
+
+                fila = self.db.consultar(
+                    conn, "agendar_cita.conflicto",
+                    f"SELECT id_cita FROM citas WHERE {_CONDICION_SOLAPE} ORDER BY fecha, minuto_inicio LIMIT 1",
+                    solape, uno=True,
+                )
+                return ResultadoReserva(ResultadoReserva.CONFLICTO, fila[0] if fila else None, "Horario ocupado.")
         except Exception as e:
-            print(f"Error creando cita: {e}")
-            return False
-        finally:
-            conn.close()
+            print(f"Error agendando cita: {e}")
+            return ResultadoReserva(ResultadoReserva.ERROR, mensaje=str(e))
+
+    def obtener_horarios_libres(self, fecha_inicio, dias=1, duracion_minutos=1):
+        """Huecos libres de cada barbero activo entre apertura y cierre.
+
+        Retorna {fecha: {id_barbero: [(inicio_min, fin_min), ...]}} con
+        intervalos de al menos `duracion_minutos`. Una sola consulta trae las
+        citas del rango; cada día/barbero es un mapa de bits por minuto
+        (bytearray) donde las citas apagan su tramo.
+        """
+        with self.db.conexion() as conn:
+            if not conn: return {}
+
+            try:
+                config = dict(self.db.consultar(
+                    conn, "horarios_libres.config",
+                    "SELECT clave, valor FROM configuracion WHERE clave IN ('apertura', 'cierre')",
+                ))
+                apertura = a_minutos(config.get("apertura", "08:00"))
+                cierre = a_minutos(config.get("cierre", "18:00"))
+                barberos = [fila[0] for fila in self.db.consultar(
+                    conn, "horarios_libres.barberos", "SELECT id_barbero FROM barberos WHERE activo = 1"
+                )]
+                inicio = date.fromisoformat(fecha_inicio)
+                fechas = [(inicio + timedelta(days=i)).isoformat() for i in range(dias)]
+                fin_rango = (inicio + timedelta(days=dias)).isoformat()
+                # Desde el día anterior: sus citas pueden cruzar la medianoche
+                citas = self.db.consultar(conn, "horarios_libres.citas", """
+                    SELECT fecha, id_barbero, minuto_inicio, minuto_fin
+                    FROM citas
+                    WHERE fecha >= ? AND fecha < ?
+                      AND estado != 'Cancelada'
+                """, (_dia_vecino(fecha_inicio, -1), fin_rango))
+            except Exception as e:
+                print(f"Error calculando horarios libres: {e}")
+                return {}
+
+        largo = max(cierre - apertura, 0)
+        mapas = {(f, b): bytearray(b"\x01") * largo for f in fechas for b in barberos}
+        def ocupar(fecha, id_barbero, inicio, fin):
+            mapa = mapas.get((fecha, id_barbero))
+            if mapa is None:
+                return
+            desde = max(inicio - apertura, 0)
+            hasta = min(fin - apertura, largo)
+            if hasta > desde:
+                mapa[desde:hasta] = bytes(hasta - desde)
+
+        for fecha, id_barbero, inicio, fin in citas:
+            ocupar(fecha, id_barbero, inicio, fin)
+            if fin > MINUTOS_DIA:
+                ocupar(_dia_vecino(fecha, 1), id_barbero, 0, fin - MINUTOS_DIA)
+
+        libres = {f: {} for f in fechas}
+        for (fecha, id_barbero), mapa in mapas.items():
+            huecos = []
+            pos = mapa.find(1)
+            while pos != -1:
+                fin = mapa.find(0, pos)
+                if fin == -1:
+                    fin = largo
+                if fin - pos >= duracion_minutos:
+                    huecos.append((apertura + pos, apertura + fin))
+                pos = mapa.find(1, fin)
+            libres[fecha][id_barbero] = huecos
+        return libres
+
+    def proximos_horarios_libres(self, fecha_str, id_barbero, duracion_minutos, cantidad=6, dias=7):
+        """Próximas horas de inicio 'HH:MM' posibles: [(fecha, hora), ...].
+
+        Busca desde `fecha_str` hasta `dias` días adelante; si la fecha es
+        hoy, ignora lo que ya pasó.
+        """
+        libres = self.obtener_horarios_libres(fecha_str, dias, duracion_minutos)
+        hoy = date.today().isoformat()
+        ahora = datetime.now().hour * 60 + datetime.now().minute
+        opciones = []
+        for fecha in sorted(libres):
+            for inicio, fin in libres[fecha].get(id_barbero, []):
+                if fecha == hoy:
+                    inicio = max(inicio, -(-ahora // 5) * 5)  # redondeo al próximo múltiplo de 5 min
+                while inicio + duracion_minutos <= fin:
+                    opciones.append((fecha, a_hora(inicio)))
+                    if len(opciones) >= cantidad:
+                        return opciones
+                    inicio += duracion_minutos
+        return opciones
+
+    # Columnas de una fila de agenda (el orden lo usa MainView)
+    _COLUMNAS_AGENDA = """
+        c.id_cita, c.hora_inicio, c.hora_fin, b.nombre, cl.nombre, s.nombre, c.total_estimado, c.estado, c.id_barbero
+    """
 
     def obtener_citas_por_fecha(self, fecha_str):
-        """Citas de la fecha con joins a barberos, clientes y servicios."""
-        conn = self.db.get_connection()
-        if not conn: return []
+        """Citas de la fecha con joins a barberos, clientes y servicios (vía cache de agenda)."""
+        return self.agenda.obtener(fecha_str, lambda: self._consultar_citas_por_fecha(fecha_str))
 
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT c.id_cita, c.hora_inicio, c.hora_fin, b.nombre, cl.nombre, s.nombre, c.total_estimado, c.estado
+    def citas_en_cache(self, fecha_str):
+        """Como obtener_citas_por_fecha pero sin ir a la BD: None si la fecha no está en cache."""
+        return self.agenda.en_cache(fecha_str)
+
+    def obtener_citas_rango(self, fecha_inicio, dias=7):
+        """Agenda de `dias` días desde fecha_inicio con una sola consulta para los que no estén en cache.
+
+        Retorna {fecha: {id_barbero: [fila, ...]}} para cada día del rango
+        (vacío si no hay citas); las filas son las de obtener_citas_por_fecha.
+        """
+        fechas = [_dia_vecino(fecha_inicio, i) for i in range(dias)]
+        por_fecha = self.agenda.obtener_varias(fechas, self._consultar_citas_fechas)
+        agenda = {}
+        for fecha in fechas:
+            por_barbero = agenda[fecha] = {}
+            for fila in por_fecha[fecha]:
+                por_barbero.setdefault(fila[8], []).append(fila)
+        return agenda
+
+    def precargar_dias_vecinos(self, fecha_str, radio=1):
+        """Deja en cache los `radio` días antes y después de fecha_str (para correr en segundo plano)."""
+        self.agenda.obtener_varias(
+            [_dia_vecino(fecha_str, i) for i in range(-radio, radio + 1)], self._consultar_citas_fechas
+        )
+
+    def _consultar_citas_por_fecha(self, fecha_str):
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            query = f"""
+                SELECT {self._COLUMNAS_AGENDA}
                 FROM citas c
                 JOIN barberos b ON c.id_barbero = b.id_barbero
                 JOIN clientes cl ON c.id_cliente = cl.id_cliente
                 JOIN servicios s ON c.id_servicio = s.id_servicio
                 WHERE c.fecha = ?
-                ORDER BY c.hora_inicio ASC;
+                ORDER BY c.minuto_inicio ASC;
             """
-            cursor.execute(query, (fecha_str,))
-            return cursor.fetchall()
-        finally:
-            conn.close()
+            return self.db.consultar(conn, "obtener_citas_por_fecha", query, (fecha_str,))
+
+    def _consultar_citas_fechas(self, fechas):
+        """{fecha: filas} de las fechas dadas, en una consulta sobre el rango que las cubre."""
+        resultado = {fecha: [] for fecha in fechas}
+        with self.db.conexion() as conn:
+            if not conn: return resultado
+
+            query = f"""
+                SELECT c.fecha, {self._COLUMNAS_AGENDA}
+                FROM citas c
+                JOIN barberos b ON c.id_barbero = b.id_barbero
+                JOIN clientes cl ON c.id_cliente = cl.id_cliente
+                JOIN servicios s ON c.id_servicio = s.id_servicio
+                WHERE c.fecha >= ? AND c.fecha <= ?
+                ORDER BY c.fecha, c.minuto_inicio ASC;
+            """
+            filas = self.db.consultar(conn, "obtener_citas_rango", query, (min(fechas), max(fechas)))
+        for fila in filas:
+            if fila[0] in resultado:
+                resultado[fila[0]].append(fila[1:])
+        return resultado
 
     def cancelar_cita(self, id_cita):
-        conn = self.db.get_connection()
-        if not conn: return False, "Error de conexión."
+        with self.db.conexion() as conn:
+            if not conn: return False, "Error de conexión."
 
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT estado FROM citas WHERE id_cita = ?", (id_cita,))
-            resultado = cursor.fetchone()
+            resultado = self.db.consultar(
+                conn, "estado_cita", "SELECT estado, fecha FROM citas WHERE id_cita = ?", (id_cita,), uno=True
+            )
             if not resultado: return False, "La cita no existe."
             
             if resultado[0] == 'Pagada': return False, "No se puede cancelar una cita ya cobrada."
             if resultado[0] == 'Cancelada': return False, "La cita ya está cancelada."
 
-            cursor.execute("UPDATE citas SET estado = 'Cancelada' WHERE id_cita = ?", (id_cita,))
-            conn.commit()
+            self.db.ejecutar(conn, "cancelar_cita", "UPDATE citas SET estado = 'Cancelada' WHERE id_cita = ?", (id_cita,))
+            self.db.confirmar(conn)
+            self._invalidar_agenda(conn, resultado[1])
             return True, "Cita cancelada."
-        finally:
-            conn.close()
 
     def reasignar_cliente(self, id_cita, nuevo_id_cliente):
         """Mueve una cita de 'Público General' a un cliente registrado."""
-        conn = self.db.get_connection()
-        if not conn:
-            return False, "Error de conexión."
+        with self.db.conexion() as conn:
+            if not conn:
+                return False, "Error de conexión."
 
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT c.id_cliente, cl.nombre
-                FROM citas c
-                JOIN clientes cl ON c.id_cliente = cl.id_cliente
-                WHERE c.id_cita = ?
-                """,
-                (id_cita,),
-            )
-            row = cursor.fetchone()
-            if not row:
-                return False, "La cita no existe."
+            try:
+                row = self.db.consultar(
+                    conn, "cliente_de_cita",
+                    """
+                    SELECT c.id_cliente, cl.nombre, c.fecha
+                    FROM citas c
+                    JOIN clientes cl ON c.id_cliente = cl.id_cliente
+                    WHERE c.id_cita = ?
+                    """,
+                    (id_cita,),
+                    uno=True,
+                )
+                if not row:
+                    return False, "La cita no existe."
 
-            _, nombre_actual = row
-            if nombre_actual != "Público General":
-                return False, "Solo se pueden reasignar citas de 'Público General'."
+                _, nombre_actual, fecha = row
+                if nombre_actual != "Público General":
+                    return False, "Solo se pueden reasignar citas de 'Público General'."
 
-            cursor.execute(
-                "UPDATE citas SET id_cliente = ? WHERE id_cita = ?",
-                (nuevo_id_cliente, id_cita),
-            )
-            conn.commit()
-            return True, "Cita vinculada al cliente seleccionado."
-        except Exception as e:
-            conn.rollback()
-            print(f"Error al reasignar cliente: {e}")
-            return False, "Error al reasignar la cita."
-        finally:
-            conn.close()
\ No newline at end of file
+                self.db.ejecutar(
+                    conn, "reasignar_cliente",
+                    "UPDATE citas SET id_cliente = ? WHERE id_cita = ?",
+                    (nuevo_id_cliente, id_cita),
+                )
+                self.db.confirmar(conn)
+                self._invalidar_agenda(conn, fecha)
+                return True, "Cita vinculada al cliente seleccionado."
+            except Exception as e:
+                self.db.revertir(conn)
+                print(f"Error al reasignar cliente: {e}")
+                return False, "Error al reasignar la cita."
\ No newline at end of file
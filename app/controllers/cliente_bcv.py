@@ -0,0 +1,104 @@
+"""
+Cliente HTTP del BCV, sin Qt: una requests.Session reutilizada y
+reintentos con espera exponencial. bcv_controller.ServicioTasaBCV lo usa
+desde su hilo; verificar_bcv.py lo prueba contra un servidor local.
+"""
+import os
+import random
+import time
+
+import requests
+import urllib3
+
+from controllers.bcv_parser import extraer_tasas
+
+# Desactivar advertencias de SSL inseguro (necesario para BCV)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+URL_BCV = "https://www.bcv.org.ve/"
+# Para probar contra un servidor local con las páginas de fixtures/bcv/ (ver verificar_bcv.py)
+ENTORNO_URL_BCV = "BARBERIA_URL_BCV"
+
+CABECERAS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    )
+}
+
+
+def url_bcv():
+    return os.environ.get(ENTORNO_URL_BCV) or URL_BCV
+
+
+def espera_exponencial(intento, base_s, tope_s):
+    """Segundos de espera para el intento número `intento` (1, 2, ...): exponencial con jitter completo."""
+    return random.uniform(0, min(tope_s, base_s * 2 ** (intento - 1)))
+
+
+class ClienteBCV:
+    """
+    Consulta del BCV con una sola requests.Session (keep-alive: las
+    consultas siguientes reusan la conexión TLS) y reintentos con espera
+    exponencial y jitter.
+    """
+
+    INTENTOS = 4
+    ESPERA_BASE_S = 2.0
+    ESPERA_MAXIMA_S = 120.0
+    # (conexión, lectura): la lectura cuenta entre bytes recibidos, así que
+    # también acota cuánto espera ServicioTasaBCV.detener() a un sitio colgado
+    TIMEOUT_S = (4, 8)
+
+    def __init__(self, url=None, intentos=None, espera_base_s=None, dormir=time.sleep):
+        self.url = url or url_bcv()
+        self.intentos = intentos or self.INTENTOS
+        self.espera_base_s = self.ESPERA_BASE_S if espera_base_s is None else espera_base_s
+        self._dormir = dormir
+        self.sesion = requests.Session()
+        self.sesion.headers.update(CABECERAS)
+        self.sesion.verify = False
+
+    def obtener_tasas(self):
+        """{moneda: tasa}; reintenta fallos de red, 5xx y páginas sin tasa antes de rendirse."""
+        ultimo_error = None
+        for intento in range(self.intentos):
+            # dormir() retorna True si la espera se interrumpió (el servicio se detiene)
+            if intento and self._dormir(espera_exponencial(intento, self.espera_base_s, self.ESPERA_MAXIMA_S)):
+                break
+            try:
+                response = self.sesion.get(self.url, timeout=self.TIMEOUT_S)
+                response.raise_for_status()
+                # Parser por niveles: streaming sobre los bloques de moneda, BeautifulSoup solo de respaldo
+                return extraer_tasas(response.content)
+            except requests.HTTPError as e:
+                ultimo_error = e
+                # Un 4xx (salvo 429) no se arregla reintentando
+                if e.response is not None and 400 <= e.response.status_code < 500 and e.response.status_code != 429:
+                    break
+            except (requests.RequestException, ValueError) as e:
+                ultimo_error = e
+            print(f"[BCV] Intento {intento + 1}/{self.intentos} fallido: {ultimo_error}")
+        raise ultimo_error
+
+    def cerrar(self):
+        # Puede llamarse desde otro hilo para soltar las conexiones ociosas
+        self.sesion.close()
+
+
+def obtener_tasas():
+    """{moneda: tasa} publicadas por el BCV (USD siempre; EUR, CNY, TRY, RUB si aparecen)."""
+    cliente = ClienteBCV()
+    try:
+        return cliente.obtener_tasas()
+    except Exception as e:
+        print(f"[BCV] Error real al obtener tasa: {e}")
+        raise
+    finally:
+        cliente.cerrar()
+
+
+def obtener_tasa():
+    """Obtiene la tasa USD del BCV con parsing tolerante a cambios de HTML."""
+    return obtener_tasas()["USD"]
@@ -1,3 +1,4 @@
+import re
 import sys
 import os
 
@@ -5,115 +6,259 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import DatabaseManager
+from cache_agenda import cache_agenda
+
+LIMITE_BUSQUEDA = 50
+TAMANO_PAGINA = 200
+TAMANO_PAGINA_HISTORIAL = 50
+
+
+def _expresion_fts(texto):
+    """'José 0414' -> '"José"* "0414"*': cada palabra como prefijo, todas obligatorias."""
+    return " ".join(f'"{palabra}"*' for palabra in re.findall(r"\w+", texto or ""))
+
+
+class EstadisticasCliente:
+    """Resumen de un cliente: visitas (citas pagadas), total gastado, última visita y barbero favorito."""
+
+    def __init__(self, visitas=0, total_gastado=0.0, ultima_visita=None, canceladas=0, barbero_favorito=None):
+        self.visitas = visitas
+        self.total_gastado = total_gastado
+        self.ultima_visita = ultima_visita
+        self.canceladas = canceladas
+        self.barbero_favorito = barbero_favorito
+
+    def __repr__(self):
+        return (
+            f"EstadisticasCliente(visitas={self.visitas}, total_gastado={self.total_gastado:.2f}, "
+            f"ultima_visita={self.ultima_visita!r}, canceladas={self.canceladas}, "
+            f"barbero_favorito={self.barbero_favorito!r})"
+        )
+
 
 class ClientesController:
     """CRUD de clientes, búsqueda y su historial."""
 
+    _fts_por_bd = {}  # db_path -> si existe clientes_fts
+
     def __init__(self):
         self.db = DatabaseManager()
+        self.agenda = cache_agenda(self.db)
 
     def listar_todos(self):
         """Obtiene todos los clientes ordenados por nombre."""
-        conn = self.db.get_connection()
-        if not conn: return []
+        with self.db.conexion() as conn:
+            if not conn: return []
         
-        try:
-            cursor = conn.cursor()
-            query = "SELECT id_cliente, nombre, telefono, email FROM clientes ORDER BY nombre ASC"
-            cursor.execute(query)
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error al listar clientes: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def buscar_clientes(self, texto):
-        """Busca clientes cuyo nombre O teléfono contengan el texto proporcionado."""
-        conn = self.db.get_connection()
-        if not conn: return []
-
-        try:
-            cursor = conn.cursor()
-            texto_busqueda = f"%{texto}%"
-            query = """
-                SELECT id_cliente, nombre, telefono, email 
-                FROM clientes 
-                WHERE nombre LIKE ? OR telefono LIKE ?
-                ORDER BY nombre ASC
-            """
-            cursor.execute(query, (texto_busqueda, texto_busqueda))
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error al buscar clientes: {e}")
-            return []
-        finally:
-            conn.close()
+            try:
+                query = "SELECT id_cliente, nombre, telefono, email FROM clientes ORDER BY nombre ASC"
+                return self.db.consultar(conn, "listar_todos", query)
+            except Exception as e:
+                print(f"Error al listar clientes: {e}")
+                return []
+
+    def listar_pagina(self, despues_de=None, limite=TAMANO_PAGINA, excluir_nombre=None):
+        """
+        Página de clientes en orden (nombre, id_cliente) que sigue a la fila
+        `despues_de` (None = desde el principio). Paginación por clave: cada
+        página cuesta lo mismo sin importar cuántas se hayan leído antes.
+        """
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                nombre, id_cliente = (despues_de[1], despues_de[0]) if despues_de else ("", 0)
+                query = """
+                    SELECT id_cliente, nombre, telefono, email FROM clientes
+                    WHERE (nombre, id_cliente) > (?, ?) AND nombre IS NOT ?
+                    ORDER BY nombre, id_cliente
+                    LIMIT ?
+                """
+                return self.db.consultar(conn, "listar_pagina", query, (nombre, id_cliente, excluir_nombre, limite))
+            except Exception as e:
+                print(f"Error al listar clientes: {e}")
+                return []
+
+    def buscar_clientes(self, texto, limite=LIMITE_BUSQUEDA):
+        """Los `limite` clientes que mejor coinciden por nombre, teléfono o email (sin importar acentos)."""
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                expresion = _expresion_fts(texto)
+                if not expresion:
+                    return self.db.consultar(conn, "buscar_clientes.todos", """
+                        SELECT id_cliente, nombre, telefono, email FROM clientes ORDER BY nombre ASC LIMIT ?
+                    """, (limite,))
+                if self._hay_fts(conn):
+                    # bm25: pesa más el nombre y el teléfono que el email
+                    query = """
+                        SELECT c.id_cliente, c.nombre, c.telefono, c.email
+                        FROM clientes_fts f
+                        JOIN clientes c ON c.id_cliente = f.rowid
+                        WHERE clientes_fts MATCH ?
+                        ORDER BY bm25(clientes_fts, 10.0, 5.0, 1.0, 5.0), c.nombre
+                        LIMIT ?
+                    """
+                    return self.db.consultar(conn, "buscar_clientes", query, (expresion, limite))
+
+                texto_busqueda = f"%{texto.strip()}%"
+                query = """
+                    SELECT id_cliente, nombre, telefono, email 
+                    FROM clientes 
+                    WHERE nombre LIKE ? OR telefono LIKE ? OR email LIKE ?
+                    ORDER BY nombre ASC
+                    LIMIT ?
+                """
+                return self.db.consultar(
+                    conn, "buscar_clientes.like", query, (texto_busqueda, texto_busqueda, texto_busqueda, limite)
+                )
+            except Exception as e:
+                print(f"Error al buscar clientes: {e}")
+                return []
+
+    def clientes_por_nombre(self, nombre, limite=2):
+        """Clientes cuyo nombre es exactamente `nombre` (usa idx_clientes_nombre)."""
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                query = """
+                    SELECT id_cliente, nombre, telefono, email FROM clientes
+                    WHERE nombre = ?
+                    ORDER BY id_cliente
+                    LIMIT ?
+                """
+                return self.db.consultar(conn, "clientes_por_nombre", query, (" ".join(nombre.split()), limite))
+            except Exception as e:
+                print(f"Error al buscar cliente por nombre: {e}")
+                return []
+
+    def clientes_recientes(self, limite=8, excluir_nombre=None):
+        """Clientes de las últimas citas registradas, del más reciente al más viejo."""
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                # Solo las últimas citas por rowid: no depende del tamaño de la tabla
+                query = """
+                    SELECT cl.id_cliente, cl.nombre, cl.telefono, cl.email
+                    FROM (
+                        SELECT id_cliente, MAX(id_cita) AS ultima
+                        FROM (SELECT id_cita, id_cliente FROM citas ORDER BY id_cita DESC LIMIT ?)
+                        GROUP BY id_cliente
+                    ) r
+                    JOIN clientes cl ON cl.id_cliente = r.id_cliente
+                    WHERE cl.nombre IS NOT ?
+                    ORDER BY r.ultima DESC
+                    LIMIT ?
+                """
+                return self.db.consultar(conn, "clientes_recientes", query, (limite * 10, excluir_nombre, limite))
+            except Exception as e:
+                print(f"Error al obtener clientes recientes: {e}")
+                return []
+
+    def _hay_fts(self, conn):
+        """Si la BD tiene el índice clientes_fts (el SQLite instalado puede no traer FTS5)."""
+        hay = ClientesController._fts_por_bd.get(self.db.db_path)
+        if hay is None:
+            hay = self.db.consultar(
+                conn, "buscar_clientes.hay_fts",
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clientes_fts'", uno=True,
+            ) is not None
+            ClientesController._fts_por_bd[self.db.db_path] = hay
+        return hay
 
     def crear_cliente(self, nombre, telefono, email=None):
         """Inserta un nuevo cliente."""
-        conn = self.db.get_connection()
-        if not conn: return False
-
-        try:
-            cursor = conn.cursor()
-            query = "INSERT INTO clientes (nombre, telefono, email) VALUES (?, ?, ?)"
-            cursor.execute(query, (nombre, telefono, email))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error al crear cliente: {e}")
-            return False
-        finally:
-            conn.close()
+        with self.db.conexion() as conn:
+            if not conn: return False
+
+            try:
+                query = "INSERT INTO clientes (nombre, telefono, email) VALUES (?, ?, ?)"
+                self.db.ejecutar(conn, "crear_cliente", query, (nombre, telefono, email))
+                self.db.confirmar(conn)
+                return True
+            except Exception as e:
+                print(f"Error al crear cliente: {e}")
+                return False
 
     def editar_cliente(self, id_cliente, nombre, telefono, email=None):
         """Actualiza los datos de un cliente existente."""
-        conn = self.db.get_connection()
-        if not conn: return False
-
-        try:
-            cursor = conn.cursor()
-            query = """
-                UPDATE clientes 
-                SET nombre = ?, telefono = ?, email = ?
-                WHERE id_cliente = ?
-            """
-            cursor.execute(query, (nombre, telefono, email, id_cliente))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error al editar cliente: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def obtener_historial_cliente(self, id_cliente):
-        """Historial de citas no canceladas con servicios y barberos."""
-        conn = self.db.get_connection()
-        if not conn: return []
-
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT 
-                    c.fecha, 
-                    c.hora_inicio, 
-                    s.nombre AS servicio, 
-                    b.nombre AS barbero, 
-                    c.total_estimado, 
-                    c.estado
-                FROM citas c
-                JOIN servicios s ON c.id_servicio = s.id_servicio
-                JOIN barberos b ON c.id_barbero = b.id_barbero
-                WHERE c.id_cliente = ? 
-                  AND c.estado != 'Cancelada'
-                ORDER BY c.fecha DESC, c.hora_inicio DESC;
-            """
-            cursor.execute(query, (id_cliente,))
-            return cursor.fetchall()
-        except Exception as e:
-            print(f"Error al obtener historial del cliente: {e}")
-            return []
-        finally:
-            conn.close()
\ No newline at end of file
+        with self.db.conexion() as conn:
+            if not conn: return False
+
+            try:
+                query = """
+                    UPDATE clientes 
+                    SET nombre = ?, telefono = ?, email = ?
+                    WHERE id_cliente = ?
+                """
+                self.db.ejecutar(conn, "editar_cliente", query, (nombre, telefono, email, id_cliente))
+                self.db.confirmar(conn)
+                # Los nombres de clientes salen en la agenda de cualquier fecha
+                self.db.tras_confirmar(conn, self.agenda.limpiar)
+                return True
+            except Exception as e:
+                print(f"Error al editar cliente: {e}")
+                return False
+
+    def obtener_estadisticas_cliente(self, id_cliente):
+        """EstadisticasCliente desde las tablas que mantienen los triggers de citas (sin recorrer el historial)."""
+        with self.db.conexion() as conn:
+            if not conn: return EstadisticasCliente()
+
+            try:
+                fila = self.db.consultar(conn, "estadisticas_cliente", """
+                    SELECT e.visitas, e.total_gastado, e.ultima_visita, e.canceladas,
+                           (SELECT b.nombre FROM clientes_barberos cb
+                            JOIN barberos b ON b.id_barbero = cb.id_barbero
+                            WHERE cb.id_cliente = e.id_cliente
+                            ORDER BY cb.visitas DESC, b.nombre
+                            LIMIT 1)
+                    FROM clientes_estadisticas e
+                    WHERE e.id_cliente = ?
+                """, (id_cliente,), uno=True)
+                return EstadisticasCliente(*fila) if fila else EstadisticasCliente()
+            except Exception as e:
+                print(f"Error al obtener estadísticas del cliente: {e}")
+                return EstadisticasCliente()
+
+    def obtener_historial_cliente(self, id_cliente, despues_de=None, limite=TAMANO_PAGINA_HISTORIAL):
+        """
+        Página del historial de citas no canceladas, de la más reciente a la
+        más vieja, que sigue a la fila `despues_de` (None = la primera).
+        Filas: (fecha, hora_inicio, servicio, barbero, total_estimado, estado,
+        minuto_inicio, id_cita); las dos últimas son la clave de paginación.
+        """
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                # Sin fila previa, una clave mayor que cualquier cita
+                fecha, minuto, id_cita = (despues_de[0], despues_de[6], despues_de[7]) if despues_de else ("9999-12-31", 0, 0)
+                query = """
+                    SELECT 
+                        c.fecha, 
+                        c.hora_inicio, 
+                        s.nombre AS servicio, 
+                        b.nombre AS barbero, 
+                        c.total_estimado, 
+                        c.estado,
+                        c.minuto_inicio,
+                        c.id_cita
+                    FROM citas c
+                    JOIN servicios s ON c.id_servicio = s.id_servicio
+                    JOIN barberos b ON c.id_barbero = b.id_barbero
+                    WHERE c.id_cliente = ? 
+                      AND c.estado != 'Cancelada'
+                      AND (c.fecha, c.minuto_inicio, c.id_cita) < (?, ?, ?)
+                    ORDER BY c.fecha DESC, c.minuto_inicio DESC, c.id_cita DESC
+                    LIMIT ?;
+                """
+                return self.db.consultar(
+                    conn, "obtener_historial_cliente", query, (id_cliente, fecha, minuto, id_cita, limite)
+                )
+            except Exception as e:
+                print(f"Error al obtener historial del cliente: {e}")
+                return []
@@ -5,64 +5,70 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import DatabaseManager
+from cache_agenda import cache_agenda
 
 class PagosController:
     """Pagos y caja con transacciones atómicas."""
 
     def __init__(self):
         self.db = DatabaseManager()
+        self.agenda = cache_agenda(self.db)
 
     def obtener_detalle_cita(self, id_cita):
         """Detalle rápido de la cita para el ticket previo al cobro."""
-        conn = self.db.get_connection()
-        if not conn: return None
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT cl.nombre, s.nombre, c.total_estimado, c.hora_inicio
-                FROM citas c
-                JOIN clientes cl ON c.id_cliente = cl.id_cliente
-                JOIN servicios s ON c.id_servicio = s.id_servicio
-                WHERE c.id_cita = ?
-            """
-            cursor.execute(query, (id_cita,))
-            return cursor.fetchone()
-        except Exception as e:
-            print(f"Error al obtener detalle de cita: {e}")
-            return None
-        finally:
-            conn.close()
+        with self.db.conexion() as conn:
+            if not conn: return None
+            try:
+                query = """
+                    SELECT cl.nombre, s.nombre, c.total_estimado, c.hora_inicio
+                    FROM citas c
+                    JOIN clientes cl ON c.id_cliente = cl.id_cliente
+                    JOIN servicios s ON c.id_servicio = s.id_servicio
+                    WHERE c.id_cita = ?
+                """
+                return self.db.consultar(conn, "obtener_detalle_cita", query, (id_cita,), uno=True)
+            except Exception as e:
+                print(f"Error al obtener detalle de cita: {e}")
+                return None
 
-    def registrar_pago(self, id_cita, monto, metodo_pago, referencia):
-        """Tx: inserta pago y marca la cita como pagada; rollback si algo falla."""
-        conn = self.db.get_connection()
-        if not conn: return False
+    def registrar_pago(self, id_cita, monto, metodo_pago, referencia, tasa_bcv=None, monto_bs=0.0):
+        """Tx: inserta pago y marca la cita como pagada; rollback si algo falla.
 
-        try:
-            cursor = conn.cursor()
+        Guarda con el pago la tasa BCV usada al cobrar (si no se indica, la
+        última del historial) y los Bs efectivamente recibidos.
+        """
+        with self.db.conexion() as conn:
+            if not conn: return False
+
+            try:
             
-            # Evitar cobrar citas ya cerradas
-            cursor.execute("SELECT estado FROM citas WHERE id_cita = ?", (id_cita,))
-            estado_actual = cursor.fetchone()[0]
-            if estado_actual in ['Pagada', 'Cancelada']:
-                print("Intento de pago sobre cita ya cerrada.")
-                return False
+                # Evitar cobrar citas ya cerradas
+                estado_actual, fecha = self.db.consultar(
+                    conn, "registrar_pago.estado", "SELECT estado, fecha FROM citas WHERE id_cita = ?", (id_cita,), uno=True
+                )
+                if estado_actual in ['Pagada', 'Cancelada']:
+                    print("Intento de pago sobre cita ya cerrada.")
+                    return False
 
-            query_pago = """
-                INSERT INTO pagos (id_cita, monto, metodo_pago, referencia)
-                VALUES (?, ?, ?, ?)
-            """
-            cursor.execute(query_pago, (id_cita, monto, metodo_pago, referencia))
+                query_pago = """
+                    INSERT INTO pagos (id_cita, monto, metodo_pago, referencia, tasa_bcv, monto_bs)
+                    VALUES (?, ?, ?, ?, COALESCE(?, (
+                        SELECT valor FROM tasas WHERE moneda = 'USD' ORDER BY obtenida_en DESC, id_tasa DESC LIMIT 1
+                    )), ?)
+                """
+                self.db.ejecutar(conn, "registrar_pago.insertar", query_pago, (
+                    id_cita, monto, metodo_pago, referencia, tasa_bcv if tasa_bcv and tasa_bcv > 0 else None, monto_bs,
+                ))
 
-            query_cita = "UPDATE citas SET estado = 'Pagada' WHERE id_cita = ?"
-            cursor.execute(query_cita, (id_cita,))
-            conn.commit()
-            print(f"Pago registrado con éxito para cita ID {id_cita}")
-            return True
+                query_cita = "UPDATE citas SET estado = 'Pagada' WHERE id_cita = ?"
+                self.db.ejecutar(conn, "registrar_pago.marcar_cita", query_cita, (id_cita,))
+                self.db.confirmar(conn)
+                # La agenda muestra el estado: solo cambia el día de la cita
+                self.db.tras_confirmar(conn, lambda: self.agenda.invalidar(fecha))
+                print(f"Pago registrado con éxito para cita ID {id_cita}")
+                return True
 
-        except Exception as e:
-            conn.rollback() # Deshacer todo si hay error
-            print(f"Error CRÍTICO en transacción de pago: {e}")
-            return False
-        finally:
-            conn.close()
\ No newline at end of file
+            except Exception as e:
+                self.db.revertir(conn) # Deshacer todo si hay error
+                print(f"Error CRÍTICO en transacción de pago: {e}")
+                return False
\ No newline at end of file
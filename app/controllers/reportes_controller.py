@@ -1,192 +1,205 @@
 import sys
 import os
+from datetime import date, timedelta
 
 # Ajuste de path para importar database correctamente
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import DatabaseManager
 
+def _rango_dias(fecha_inicio, fecha_fin=None):
+    """Límites [inicio, fin+1) en ISO para filtrar sin envolver la columna en date()."""
+    fin = date.fromisoformat(fecha_fin or fecha_inicio) + timedelta(days=1)
+    return fecha_inicio, fin.isoformat()
+
+
 class ReportesController:
-    """Reportes y agregaciones (GROUP BY, SUM, COUNT)."""
+    """Reportes y agregaciones (GROUP BY, SUM, COUNT).
+
+    Los filtros por fecha usan rangos semiabiertos sobre la columna desnuda
+    para que SQLite pueda usar idx_citas_* / idx_pagos_fecha.
+    """
 
     def __init__(self):
         self.db = DatabaseManager()
 
     def obtener_cierre_diario(self, fecha_str):
         """Suma ingresos por método de pago en la fecha dada (YYYY-MM-DD)."""
-        conn = self.db.get_connection()
-        if not conn: return []
+        with self.db.conexion() as conn:
+            if not conn: return []
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            # SQLite guarda las fechas como texto ISO; date() las normaliza para agrupar.
-            query = """
-                SELECT metodo_pago, SUM(monto)
-                FROM pagos
-                WHERE date(fecha_pago) = date(?)
-                GROUP BY metodo_pago
-                ORDER BY metodo_pago ASC
-            """
+                # SQLite guarda las fechas como texto ISO: el rango textual equivale al día completo.
+                query = """
+                    SELECT metodo_pago, SUM(monto)
+                    FROM pagos
+                    WHERE fecha_pago >= ? AND fecha_pago < ?
+                    GROUP BY metodo_pago
+                    ORDER BY metodo_pago ASC
+                """
             
-            cursor.execute(query, (fecha_str,))
-            resultados = cursor.fetchall()
-            return resultados
-
-        except Exception as e:
-            print(f"Error generando cierre diario: {e}")
-            return []
-        finally:
-            conn.close()
+                resultados = self.db.consultar(conn, "obtener_cierre_diario", query, _rango_dias(fecha_str))
+                return resultados
+
+            except Exception as e:
+                print(f"Error generando cierre diario: {e}")
+                return []
+
+    def obtener_cierre_bolivares(self, fecha_inicio, fecha_fin):
+        """Por método: [(metodo, total_usd, bs_recibidos, equivalente_bs)] con la tasa guardada en cada pago.
+
+        Sale solo de la BD (sin consultar el BCV), así el mismo rango da
+        siempre las mismas cifras. Los pagos anteriores al historial de
+        tasas no tienen tasa y no suman al equivalente.
+        """
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                query = """
+                    SELECT metodo_pago,
+                           SUM(monto),
+                           COALESCE(SUM(monto_bs), 0),
+                           COALESCE(SUM(monto * tasa_bcv), 0)
+                    FROM pagos
+                    WHERE fecha_pago >= ? AND fecha_pago < ?
+                    GROUP BY metodo_pago
+                    ORDER BY metodo_pago ASC
+                """
+                return self.db.consultar(conn, "obtener_cierre_bolivares", query, _rango_dias(fecha_inicio, fecha_fin))
+            except Exception as e:
+                print(f"Error generando cierre en bolívares: {e}")
+                return []
 
     def obtener_comisiones(self, fecha_inicio, fecha_fin):
         """Calcula comisiones por barbero en un rango de fechas."""
-        conn = self.db.get_connection()
-        if not conn:
-            return []
+        with self.db.conexion() as conn:
+            if not conn:
+                return []
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            query = """
-                SELECT b.nombre, SUM(c.total_estimado)
-                FROM citas c
-                JOIN barberos b ON c.id_barbero = b.id_barbero
-                WHERE c.estado = 'Pagada'
-                AND date(c.fecha) BETWEEN date(?) AND date(?)
-                GROUP BY b.nombre
-            """
+                query = """
+                    SELECT b.nombre, SUM(c.total_estimado)
+                    FROM citas c
+                    JOIN barberos b ON c.id_barbero = b.id_barbero
+                    WHERE c.estado = 'Pagada'
+                    AND c.fecha >= ? AND c.fecha < ?
+                    GROUP BY b.nombre
+                """
             
-            cursor.execute(query, (fecha_inicio, fecha_fin))
-            resultados = cursor.fetchall()
-            return resultados
+                resultados = self.db.consultar(conn, "obtener_comisiones", query, _rango_dias(fecha_inicio, fecha_fin))
+                return resultados
 
-        except Exception as e:
-            print(f"Error generando reporte de comisiones: {e}")
-            return []
-        finally:
-            conn.close()
+            except Exception as e:
+                print(f"Error generando reporte de comisiones: {e}")
+                return []
 
     def obtener_ingresos_semana(self):
         """Retorna [(Fecha, MontoTotal)] de los últimos 7 días."""
-        conn = self.db.get_connection()
-        if not conn:
-            return []
+        with self.db.conexion() as conn:
+            if not conn:
+                return []
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            query = """
-                SELECT date(fecha_pago) as fecha, SUM(monto) as total
-                FROM pagos
-                WHERE date(fecha_pago) >= date('now', '-7 days')
-                GROUP BY date(fecha_pago)
-                ORDER BY fecha ASC
-            """
+                query = """
+                    SELECT date(fecha_pago) as fecha, SUM(monto) as total
+                    FROM pagos
+                    WHERE fecha_pago >= date('now', '-7 days')
+                    GROUP BY date(fecha_pago)
+                    ORDER BY fecha ASC
+                """
             
-            cursor.execute(query)
-            resultados = cursor.fetchall()
-            return resultados
+                resultados = self.db.consultar(conn, "obtener_ingresos_semana", query)
+                return resultados
 
-        except Exception as e:
-            print(f"Error obteniendo ingresos de la semana: {e}")
-            return []
-        finally:
-            conn.close()
+            except Exception as e:
+                print(f"Error obteniendo ingresos de la semana: {e}")
+                return []
 
     def obtener_top_servicios(self):
         """Retorna [(NombreServicio, Cantidad)] (Top 5)."""
-        conn = self.db.get_connection()
-        if not conn:
-            return []
+        with self.db.conexion() as conn:
+            if not conn:
+                return []
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            query = """
-                SELECT s.nombre, COUNT(c.id_cita) as cantidad
-                FROM citas c
-                JOIN servicios s ON c.id_servicio = s.id_servicio
-                WHERE c.estado = 'Pagada'
-                GROUP BY s.nombre
-                ORDER BY cantidad DESC
-                LIMIT 5
-            """
+                query = """
+                    SELECT s.nombre, COUNT(c.id_cita) as cantidad
+                    FROM citas c
+                    JOIN servicios s ON c.id_servicio = s.id_servicio
+                    WHERE c.estado = 'Pagada'
+                    GROUP BY s.nombre
+                    ORDER BY cantidad DESC
+                    LIMIT 5
+                """
             
-            cursor.execute(query)
-            resultados = cursor.fetchall()
-            return resultados
+                resultados = self.db.consultar(conn, "obtener_top_servicios", query)
+                return resultados
 
-        except Exception as e:
-            print(f"Error obteniendo top servicios: {e}")
-            return []
-        finally:
-            conn.close()
+            except Exception as e:
+                print(f"Error obteniendo top servicios: {e}")
+                return []
 
     def obtener_rendimiento_barberos_mes(self):
         """Retorna [(NombreBarbero, TotalDinero)] del mes actual."""
-        conn = self.db.get_connection()
-        if not conn:
-            return []
+        with self.db.conexion() as conn:
+            if not conn:
+                return []
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            query = """
-                SELECT b.nombre, SUM(c.total_estimado) as total
-                FROM citas c
-                JOIN barberos b ON c.id_barbero = b.id_barbero
-                WHERE c.estado = 'Pagada'
-                AND strftime('%Y-%m', c.fecha) = strftime('%Y-%m', 'now')
-                GROUP BY b.nombre
-                ORDER BY total DESC
-            """
+                query = """
+                    SELECT b.nombre, SUM(c.total_estimado) as total
+                    FROM citas c
+                    JOIN barberos b ON c.id_barbero = b.id_barbero
+                    WHERE c.estado = 'Pagada'
+                    AND c.fecha >= date('now', 'start of month')
+                    AND c.fecha < date('now', 'start of month', '+1 month')
+                    GROUP BY b.nombre
+                    ORDER BY total DESC
+                """
             
-            cursor.execute(query)
-            resultados = cursor.fetchall()
-            return resultados
+                resultados = self.db.consultar(conn, "obtener_rendimiento_barberos_mes", query)
+                return resultados
 
-        except Exception as e:
-            print(f"Error obteniendo rendimiento de barberos: {e}")
-            return []
-        finally:
-            conn.close()
+            except Exception as e:
+                print(f"Error obteniendo rendimiento de barberos: {e}")
+                return []
 
     def obtener_kpis_hoy(self):
         """Retorna diccionario { 'ventas_hoy': $$, 'citas_hoy': ## }."""
-        conn = self.db.get_connection()
-        if not conn:
-            return {'ventas_hoy': 0.0, 'citas_hoy': 0}
+        with self.db.conexion() as conn:
+            if not conn:
+                return {'ventas_hoy': 0.0, 'citas_hoy': 0}
 
-        try:
-            cursor = conn.cursor()
+            try:
             
-            # Ventas hoy
-            query_ventas = """
-                SELECT COALESCE(SUM(monto), 0)
-                FROM pagos
-                WHERE date(fecha_pago) = date('now')
-            """
-            cursor.execute(query_ventas)
-            ventas_hoy = cursor.fetchone()[0]
+                # Ventas hoy
+                query_ventas = """
+                    SELECT COALESCE(SUM(monto), 0)
+                    FROM pagos
+                    WHERE fecha_pago >= date('now') AND fecha_pago < date('now', '+1 day')
+                """
+                ventas_hoy = self.db.consultar(conn, "obtener_kpis_hoy.ventas", query_ventas, uno=True)[0]
             
-            # Citas hoy
-            query_citas = """
-                SELECT COUNT(*)
-                FROM citas
-                WHERE date(fecha) = date('now')
-                AND estado IN ('Pendiente', 'Pagada')
-            """
-            cursor.execute(query_citas)
-            citas_hoy = cursor.fetchone()[0]
+                # Citas hoy
+                query_citas = """
+                    SELECT COUNT(*)
+                    FROM citas
+                    WHERE estado IN ('Pendiente', 'Pagada')
+                    AND fecha >= date('now') AND fecha < date('now', '+1 day')
+                """
+                citas_hoy = self.db.consultar(conn, "obtener_kpis_hoy.citas", query_citas, uno=True)[0]
             
-            return {
-                'ventas_hoy': float(ventas_hoy),
-                'citas_hoy': int(citas_hoy)
-            }
-
-        except Exception as e:
-            print(f"Error obteniendo KPIs de hoy: {e}")
-            return {'ventas_hoy': 0.0, 'citas_hoy': 0}
-        finally:
-            conn.close()
\ No newline at end of file
+                return {
+                    'ventas_hoy': float(ventas_hoy),
+                    'citas_hoy': int(citas_hoy)
+                }
+
+            except Exception as e:
+                print(f"Error obteniendo KPIs de hoy: {e}")
+                return {'ventas_hoy': 0.0, 'citas_hoy': 0}
\ No newline at end of file
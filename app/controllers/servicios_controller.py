@@ -5,93 +5,84 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from database import DatabaseManager
+from cache_agenda import cache_agenda
 
 class ServiciosController:
     """CRUD de servicios con soft delete."""
 
     def __init__(self):
         self.db = DatabaseManager()
+        self.agenda = cache_agenda(self.db)
 
     def listar_activos(self):
         """Servicios activos (activo=1) o lista vacía si falla."""
-        conn = self.db.get_connection()
-        if not conn:
-            return []
+        with self.db.conexion() as conn:
+            if not conn:
+                return []
         
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT id_servicio, nombre, precio, duracion_minutos, descripcion 
-                FROM servicios 
-                WHERE activo = 1 
-                ORDER BY nombre ASC
-            """
-            cursor.execute(query)
-            resultados = cursor.fetchall()
-            return resultados
-        except Exception as e:
-            print(f"Error al listar servicios: {e}")
-            return []
-        finally:
-            conn.close()
+            try:
+                query = """
+                    SELECT id_servicio, nombre, precio, duracion_minutos, descripcion 
+                    FROM servicios 
+                    WHERE activo = 1 
+                    ORDER BY nombre ASC
+                """
+                resultados = self.db.consultar(conn, "listar_activos", query)
+                return resultados
+            except Exception as e:
+                print(f"Error al listar servicios: {e}")
+                return []
 
     def crear_servicio(self, nombre, precio, duracion, descripcion=""):
         """Crea servicio; retorna True/False."""
-        conn = self.db.get_connection()
-        if not conn:
-            return False
+        with self.db.conexion() as conn:
+            if not conn:
+                return False
 
-        try:
-            cursor = conn.cursor()
-            query = """
-                INSERT INTO servicios (nombre, precio, duracion_minutos, descripcion, activo)
-                VALUES (?, ?, ?, ?, 1)
-            """
-            cursor.execute(query, (nombre, precio, duracion, descripcion))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error al crear servicio: {e}")
-            return False
-        finally:
-            conn.close()
+            try:
+                query = """
+                    INSERT INTO servicios (nombre, precio, duracion_minutos, descripcion, activo)
+                    VALUES (?, ?, ?, ?, 1)
+                """
+                self.db.ejecutar(conn, "crear_servicio", query, (nombre, precio, duracion, descripcion))
+                self.db.confirmar(conn)
+                return True
+            except Exception as e:
+                print(f"Error al crear servicio: {e}")
+                return False
 
     def editar_servicio(self, id_servicio, nombre, precio, duracion, descripcion=""):
         """Actualiza un servicio existente."""
-        conn = self.db.get_connection()
-        if not conn:
-            return False
+        with self.db.conexion() as conn:
+            if not conn:
+                return False
 
-        try:
-            cursor = conn.cursor()
-            query = """
-                UPDATE servicios 
-                SET nombre = ?, precio = ?, duracion_minutos = ?, descripcion = ?
-                WHERE id_servicio = ?
-            """
-            cursor.execute(query, (nombre, precio, duracion, descripcion, id_servicio))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error al editar servicio: {e}")
-            return False
-        finally:
-            conn.close()
+            try:
+                query = """
+                    UPDATE servicios 
+                    SET nombre = ?, precio = ?, duracion_minutos = ?, descripcion = ?
+                    WHERE id_servicio = ?
+                """
+                self.db.ejecutar(conn, "editar_servicio", query, (nombre, precio, duracion, descripcion, id_servicio))
+                self.db.confirmar(conn)
+                # Los nombres de servicios salen en la agenda de cualquier fecha
+                self.db.tras_confirmar(conn, self.agenda.limpiar)
+                return True
+            except Exception as e:
+                print(f"Error al editar servicio: {e}")
+                return False
 
     def eliminar_servicio(self, id_servicio):
         """Soft delete: pone activo=0."""
-        conn = self.db.get_connection()
-        if not conn:
-            return False
+        with self.db.conexion() as conn:
+            if not conn:
+                return False
 
-        try:
-            cursor = conn.cursor()
-            query = "UPDATE servicios SET activo = 0 WHERE id_servicio = ?"
-            cursor.execute(query, (id_servicio,))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error al eliminar servicio: {e}")
-            return False
-        finally:
-            conn.close()
\ No newline at end of file
+            try:
+                query = "UPDATE servicios SET activo = 0 WHERE id_servicio = ?"
+                self.db.ejecutar(conn, "eliminar_servicio", query, (id_servicio,))
+                self.db.confirmar(conn)
+                return True
+            except Exception as e:
+                print(f"Error al eliminar servicio: {e}")
+                return False
\ No newline at end of file
@@ -0,0 +1,123 @@
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Ajuste de path para importar database correctamente
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import DatabaseManager
+
+
+class TasaGuardada:
+    """Última tasa BCV buena: valor (Bs/$), cuándo se obtuvo y si ya pasó su vigencia."""
+
+    def __init__(self, valor, actualizada, vieja):
+        self.valor = valor
+        self.actualizada = actualizada
+        self.vieja = vieja
+
+    def __repr__(self):
+        return f"TasaGuardada({self.valor!r}, {self.actualizada:%Y-%m-%d %H:%M}, vieja={self.vieja})"
+
+
+class TasaController:
+    """
+    Tasas BCV: historial en la tabla tasas (una fila por cada valor nuevo;
+    si el BCV repite el valor solo se actualiza confirmada_en).
+
+    Al arrancar se sirve la última guardada sin esperar a la red; solo si
+    pasó su vigencia (configuracion 'tasa_bcv_ttl_min') hace falta
+    consultar el BCV de nuevo. Las fechas se guardan en UTC, como pagos.
+    """
+
+    TTL_MINUTOS_POR_DEFECTO = 60
+
+    def __init__(self):
+        self.db = DatabaseManager()
+
+    def tasa_guardada(self, moneda="USD"):
+        """TasaGuardada con la última tasa buena de `moneda`, o None si nunca se obtuvo una."""
+        with self.db.conexion() as conn:
+            if not conn: return None
+
+            try:
+                fila = self.db.consultar(conn, "tasa_guardada", """
+                    SELECT t.valor,
+                           datetime(t.confirmada_en, 'localtime'),
+                           (julianday('now') - julianday(t.confirmada_en)) * 1440
+                               > COALESCE((SELECT CAST(valor AS INTEGER) FROM configuracion WHERE clave = 'tasa_bcv_ttl_min'), ?)
+                    FROM tasas t
+                    WHERE t.moneda = ?
+                    ORDER BY t.obtenida_en DESC, t.id_tasa DESC
+                    LIMIT 1
+                """, (self.TTL_MINUTOS_POR_DEFECTO, moneda), uno=True)
+                if not fila:
+                    return None
+                return TasaGuardada(fila[0], datetime.fromisoformat(fila[1]), bool(fila[2]))
+            except Exception as e:
+                print(f"Error leyendo tasa BCV guardada: {e}")
+                return None
+
+    def segundos_para_vencer(self, moneda="USD"):
+        """Segundos hasta que vence la última tasa de `moneda` (0 si ya venció o no hay)."""
+        with self.db.conexion() as conn:
+            if not conn: return 0
+
+            try:
+                fila = self.db.consultar(conn, "tasa_segundos_para_vencer", """
+                    SELECT COALESCE((SELECT CAST(valor AS INTEGER) FROM configuracion WHERE clave = 'tasa_bcv_ttl_min'), ?) * 60
+                           - (julianday('now') - julianday(t.confirmada_en)) * 86400
+                    FROM tasas t
+                    WHERE t.moneda = ?
+                    ORDER BY t.obtenida_en DESC, t.id_tasa DESC
+                    LIMIT 1
+                """, (self.TTL_MINUTOS_POR_DEFECTO, moneda), uno=True)
+                return max(fila[0], 0) if fila else 0
+            except Exception as e:
+                print(f"Error leyendo vigencia de la tasa BCV: {e}")
+                return 0
+
+    def guardar_tasa(self, valor, moneda="USD"):
+        """Registra `valor` como la tasa vigente de `moneda` (nueva fila solo si cambió)."""
+        with self.db.conexion() as conn:
+            if not conn: return False
+
+            try:
+                ultima = self.db.consultar(conn, "guardar_tasa.ultima", """
+                    SELECT id_tasa, valor FROM tasas
+                    WHERE moneda = ?
+                    ORDER BY obtenida_en DESC, id_tasa DESC
+                    LIMIT 1
+                """, (moneda,), uno=True)
+                if ultima and ultima[1] == float(valor):
+                    self.db.ejecutar(
+                        conn, "guardar_tasa.confirmar",
+                        "UPDATE tasas SET confirmada_en = CURRENT_TIMESTAMP WHERE id_tasa = ?", (ultima[0],),
+                    )
+                else:
+                    self.db.ejecutar(
+                        conn, "guardar_tasa.insertar",
+                        "INSERT INTO tasas (moneda, valor) VALUES (?, ?)", (moneda, float(valor)),
+                    )
+                self.db.confirmar(conn)
+                return True
+            except Exception as e:
+                self.db.revertir(conn)
+                print(f"Error guardando tasa BCV: {e}")
+                return False
+
+    def historial(self, fecha_inicio, fecha_fin, moneda="USD"):
+        """[(obtenida_en UTC, valor)] de las tasas obtenidas entre dos fechas (YYYY-MM-DD, inclusive)."""
+        with self.db.conexion() as conn:
+            if not conn: return []
+
+            try:
+                fin = (date.fromisoformat(fecha_fin) + timedelta(days=1)).isoformat()
+                return self.db.consultar(conn, "historial_tasas", """
+                    SELECT obtenida_en, valor FROM tasas
+                    WHERE moneda = ? AND obtenida_en >= ? AND obtenida_en < ?
+                    ORDER BY obtenida_en
+                """, (moneda, fecha_inicio, fin))
+            except Exception as e:
+                print(f"Error obteniendo historial de tasas: {e}")
+                return []
@@ -1,13 +1,94 @@
 import sqlite3
 import os
 import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger("barberia.db")
+
+# Ruta de otro archivo de BD en lugar de data/barberia.db (copias para diagnósticos)
+ENTORNO_RUTA_BD = "BARBERIA_RUTA_BD"
+
+
+def copiar_bd(destino, origen=None):
+    """Copia consistente (API de backup de SQLite) de la BD de la app en `destino`.
+
+    Para scripts de diagnóstico que migran o escriben y no deben tocar el
+    archivo real. Sin `origen` se copia la BD de la app; si no existe,
+    `destino` queda vacío y las migraciones crean el esquema.
+    """
+    origen = origen or DatabaseManager().db_path
+    if not os.path.exists(origen):
+        return destino
+    fuente = sqlite3.connect(f"file:{origen}?mode=ro", uri=True)
+    copia = sqlite3.connect(destino)
+    try:
+        fuente.backup(copia)
+    finally:
+        copia.close()
+        fuente.close()
+    return destino
 
 class DatabaseManager:
-    """Administra SQLite y las migraciones (multi-barbero)."""
+    """Administra SQLite y las migraciones (multi-barbero).
+
+    Las conexiones se reutilizan por hilo: cada hilo mantiene una conexión
+    persistente por archivo de BD que los controladores toman prestada con
+    `conexion()` en lugar de abrir y cerrar una en cada llamada.
+    """
+
+    # Estado compartido entre todas las instancias (cada controlador crea la suya)
+    _pool_local = threading.local()
+    _pool_lock = threading.Lock()
+    _pool_conexiones = []
+    _pool_aciertos = 0
+    _pool_fallos = 0
+    # Se incrementa al cambiar de perfil para que cada hilo reabra su conexión
+    _pool_generacion = 0
+    # Escrituras confirmadas por este proceso (las pantallas lo usan para saber si están viejas)
+    _escrituras = 0
+
+    # Perfiles de rendimiento aplicados al abrir cada conexión.
+    # El activo se guarda en configuracion (clave 'perfil_db').
+    PERFILES = {
+        # Recepción: lecturas concurrentes con escrituras (WAL) y más caché
+        "desk": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16000,      # ~16 MB
+            "mmap_size": 134217728,    # 128 MB
+            "temp_store": "MEMORY",
+        },
+        # Máxima durabilidad: modo rollback clásico con fsync completo
+        "safe": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+            "cache_size": -2000,
+            "mmap_size": 0,
+            "temp_store": "DEFAULT",
+        },
+    }
+    PERFIL_POR_DEFECTO = "desk"
+
+    # Métricas de consultas por nombre lógico (ver consultar/ejecutar)
+    _metricas = {}
+    _metricas_lock = threading.Lock()
+    # Cotas superiores (ms) de cada cubeta del histograma; la última es "más lento"
+    CUBETAS_MS = (1, 5, 10, 50, 100, 500, 1000)
+    UMBRAL_LENTA_MS_POR_DEFECTO = 200
+    _umbral_lenta_ms = None
 
     def __init__(self, db_name="barberia.db"):
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(base_dir, 'data')
+        ruta = os.environ.get(ENTORNO_RUTA_BD)
+        if ruta:
+            # Diagnósticos y benchmarks trabajan sobre una copia (ver copiar_bd)
+            data_dir, db_name = os.path.split(os.path.abspath(ruta))
+        else:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            data_dir = os.path.join(base_dir, 'data')
         
         if not os.path.exists(data_dir):
             try:
@@ -17,88 +98,742 @@ class DatabaseManager:
                 sys.exit(1)
 
         self.db_path = os.path.join(data_dir, db_name)
+        self.log_path = os.path.join(data_dir, "consultas_lentas.log")
 
     def get_connection(self):
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
             conn.execute("PRAGMA foreign_keys = ON")
+            self._aplicar_perfil(conn, self._leer_perfil(conn))
             return conn
         except sqlite3.Error as e:
             print(f"Error al conectar con la base de datos: {e}")
             return None
 
-    def inicializar_db(self):
-        """Crea las tablas y realiza migraciones si es necesario."""
-        conn = self.get_connection()
-        if conn is None: return False
+    # --- EJECUCIÓN INSTRUMENTADA ---
 
-        try:
-            cursor = conn.cursor()
+    def consultar(self, conn, nombre, sql, parametros=(), uno=False):
+        """SELECT medido bajo `nombre`: retorna fetchall() (o fetchone() si uno=True)."""
+        def correr():
+            cursor = conn.execute(sql, parametros)
+            if uno:
+                fila = cursor.fetchone()
+                return fila, (0 if fila is None else 1)
+            filas = cursor.fetchall()
+            return filas, len(filas)
+        return self._medir(conn, nombre, sql, parametros, correr)
 
-            # Base: configuracion, clientes, servicios
-            cursor.execute("CREATE TABLE IF NOT EXISTS configuracion (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);")
-            cursor.execute("CREATE TABLE IF NOT EXISTS clientes (id_cliente INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL, telefono TEXT, email TEXT, fecha_registro DATE DEFAULT CURRENT_DATE);")
-            cursor.execute("CREATE TABLE IF NOT EXISTS servicios (id_servicio INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL, descripcion TEXT, precio REAL NOT NULL, duracion_minutos INTEGER NOT NULL, activo INTEGER DEFAULT 1);")
-
-            # Nueva tabla: barberos
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS barberos (
-                    id_barbero INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL UNIQUE,
-                    activo INTEGER DEFAULT 1
-                );
-            """)
-
-            # Citas ya con FK a barberos (migra si no existe)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS citas (
-                    id_cita INTEGER PRIMARY KEY AUTOINCREMENT, 
-                    id_cliente INTEGER NOT NULL, 
-                    id_servicio INTEGER NOT NULL, 
-                    id_barbero INTEGER NOT NULL DEFAULT 1, -- FK Nueva
-                    fecha DATE NOT NULL, 
-                    hora_inicio TEXT NOT NULL, 
-                    hora_fin TEXT NOT NULL, 
-                    total_estimado REAL, 
-                    estado TEXT DEFAULT 'Pendiente', 
-                    notas TEXT, 
-                    FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente), 
-                    FOREIGN KEY (id_servicio) REFERENCES servicios(id_servicio),
-                    FOREIGN KEY (id_barbero) REFERENCES barberos(id_barbero)
-                );
-            """)
-
-            # Pagos
-            cursor.execute("CREATE TABLE IF NOT EXISTS pagos (id_pago INTEGER PRIMARY KEY AUTOINCREMENT, id_cita INTEGER NOT NULL, monto REAL NOT NULL, metodo_pago TEXT NOT NULL, referencia TEXT, fecha_pago DATETIME DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (id_cita) REFERENCES citas(id_cita));")
-
-            # --- MIGRACIÓN DE DATOS Y COLUMNAS ---
-
-            # Seed básico: Ale y Fran
-            barberos_data = [("Ale",), ("Fran",)]
-            cursor.executemany("INSERT OR IGNORE INTO barberos (nombre) VALUES (?)", barberos_data)
-
-            # Si citas existe sin id_barbero, la ampliamos sin perder datos
-            cursor.execute("PRAGMA table_info(citas)")
-            columnas = [col[1] for col in cursor.fetchall()]
-            if 'id_barbero' not in columnas:
-                print("Migrando DB: Agregando columna id_barbero a citas...")
-                cursor.execute("ALTER TABLE citas ADD COLUMN id_barbero INTEGER NOT NULL DEFAULT 1")
-
-            # Horario por defecto
-            config_data = [("apertura", "08:00"), ("cierre", "18:00")]
-            cursor.executemany("INSERT OR IGNORE INTO configuracion (clave, valor) VALUES (?, ?)", config_data)
-
-            conn.commit()
-            print("Base de datos inicializada y migrada correctamente.")
-            return True
+    def ejecutar(self, conn, nombre, sql, parametros=()):
+        """INSERT/UPDATE/DELETE medido bajo `nombre`: retorna el cursor."""
+        def correr():
+            cursor = conn.execute(sql, parametros)
+            return cursor, max(cursor.rowcount, 0)
+        return self._medir(conn, nombre, sql, parametros, correr)
 
+    def _medir(self, conn, nombre, sql, parametros, correr):
+        inicio = time.perf_counter()
+        try:
+            resultado, filas = correr()
         except sqlite3.Error as e:
-            print(f"Error al inicializar/migrar la base de datos: {e}")
-            conn.rollback()
+            self._logger_consultas().error("%s falló: %s | %s", nombre, e, " ".join(sql.split()))
+            raise
+        ms = (time.perf_counter() - inicio) * 1000
+        self._registrar_metrica(nombre, ms, filas)
+        if ms >= self.umbral_consulta_lenta_ms(conn):
+            self._registrar_lenta(conn, nombre, sql, parametros, ms, filas)
+        return resultado
+
+    @classmethod
+    def _registrar_metrica(cls, nombre, ms, filas):
+        with cls._metricas_lock:
+            m = cls._metricas.get(nombre)
+            if m is None:
+                m = cls._metricas[nombre] = {
+                    "llamadas": 0, "filas": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "histograma": [0] * (len(cls.CUBETAS_MS) + 1),
+                }
+            m["llamadas"] += 1
+            m["filas"] += filas
+            m["total_ms"] += ms
+            m["max_ms"] = max(m["max_ms"], ms)
+            cubeta = next((i for i, tope in enumerate(cls.CUBETAS_MS) if ms <= tope), len(cls.CUBETAS_MS))
+            m["histograma"][cubeta] += 1
+
+    def _registrar_lenta(self, conn, nombre, sql, parametros, ms, filas):
+        try:
+            plan = [fila[-1] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+        except sqlite3.Error:
+            plan = ["(plan no disponible)"]
+        self._logger_consultas().warning(
+            "LENTA %s %.1f ms, %d filas | %s | params=%r | plan: %s",
+            nombre, ms, filas, " ".join(sql.split()), tuple(parametros), " / ".join(plan),
+        )
+
+    def _logger_consultas(self):
+        """Logger con archivo rotativo en data/ (se configura una sola vez)."""
+        if not logger.handlers:
+            try:
+                handler = RotatingFileHandler(self.log_path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+            except OSError:
+                handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        return logger
+
+    def umbral_consulta_lenta_ms(self, conn=None):
+        """Umbral configurable (clave 'umbral_consulta_lenta_ms'); se lee una vez por proceso."""
+        if DatabaseManager._umbral_lenta_ms is None:
+            umbral = self.UMBRAL_LENTA_MS_POR_DEFECTO
+            if conn is not None:
+                try:
+                    fila = conn.execute(
+                        "SELECT valor FROM configuracion WHERE clave = 'umbral_consulta_lenta_ms'"
+                    ).fetchone()
+                    if fila:
+                        umbral = float(fila[0])
+                except (sqlite3.Error, ValueError):
+                    pass
+            DatabaseManager._umbral_lenta_ms = umbral
+        return DatabaseManager._umbral_lenta_ms
+
+    @classmethod
+    def metricas_consultas(cls):
+        """Copia de las métricas: {nombre: {llamadas, filas, total_ms, max_ms, histograma}}."""
+        with cls._metricas_lock:
+            return {nombre: dict(m, histograma=list(m["histograma"])) for nombre, m in cls._metricas.items()}
+
+    def resumen_metricas(self):
+        """Tabla de texto con las consultas ordenadas por tiempo total."""
+        cubetas = [f"<={tope}ms" for tope in self.CUBETAS_MS] + [f">{self.CUBETAS_MS[-1]}ms"]
+        lineas = [f"{'consulta':<36}{'llamadas':>9}{'filas':>9}{'prom ms':>10}{'max ms':>10}  histograma ({' '.join(cubetas)})"]
+        metricas = self.metricas_consultas()
+        for nombre, m in sorted(metricas.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            promedio = m["total_ms"] / m["llamadas"]
+            histograma = " ".join(str(n) for n in m["histograma"])
+            lineas.append(f"{nombre:<36}{m['llamadas']:>9}{m['filas']:>9}{promedio:>10.2f}{m['max_ms']:>10.2f}  {histograma}")
+        return "\n".join(lineas)
+
+    def registrar_resumen_metricas(self):
+        """Vuelca el resumen de métricas al log de consultas (al cerrar la app)."""
+        if self.metricas_consultas():
+            self._logger_consultas().info("Resumen de consultas de la sesión:\n%s", self.resumen_metricas())
+
+    def _leer_perfil(self, conn):
+        """Nombre del perfil guardado en configuracion (o el de por defecto)."""
+        try:
+            fila = conn.execute("SELECT valor FROM configuracion WHERE clave = 'perfil_db'").fetchone()
+        except sqlite3.Error:
+            fila = None  # BD nueva: la tabla aún no existe
+        if fila and fila[0] in self.PERFILES:
+            return fila[0]
+        return self.PERFIL_POR_DEFECTO
+
+    def _aplicar_perfil(self, conn, nombre):
+        for pragma, valor in self.PERFILES[nombre].items():
+            try:
+                conn.execute(f"PRAGMA {pragma} = {valor}")
+            except sqlite3.Error as e:
+                # p.ej. salir de WAL con otra terminal conectada; se reintenta en la próxima conexión
+                print(f"No se pudo aplicar PRAGMA {pragma} ({nombre}): {e}")
+
+    def perfil_activo(self):
+        """Retorna (nombre, {pragma: valor efectivo}) según la conexión actual."""
+        with self.conexion() as conn:
+            if conn is None:
+                return None, {}
+            nombre = self._leer_perfil(conn)
+            efectivos = {}
+            for pragma in self.PERFILES[nombre]:
+                efectivos[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            return nombre, efectivos
+
+    def establecer_perfil(self, nombre):
+        """Guarda el perfil y fuerza a que las conexiones se reabran con él."""
+        if nombre not in self.PERFILES:
             return False
+        with self.conexion() as conn:
+            if conn is None:
+                return False
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO configuracion (clave, valor) VALUES ('perfil_db', ?)",
+                    (nombre,),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error al guardar el perfil de BD: {e}")
+                conn.rollback()
+                return False
+        with DatabaseManager._pool_lock:
+            DatabaseManager._pool_generacion += 1
+        return True
+
+    @contextmanager
+    def conexion(self):
+        """Presta la conexión persistente del hilo actual (None si falla).
+
+        Al devolverla se descarta cualquier transacción que el controlador
+        haya dejado abierta, igual que ocurría antes al cerrarla.
+        """
+        conexiones = getattr(self._pool_local, "conexiones", None)
+        if conexiones is None:
+            conexiones = self._pool_local.conexiones = {}
+
+        entrada = conexiones.get(self.db_path)
+        if entrada is not None and entrada["generacion"] != DatabaseManager._pool_generacion and entrada["prestamos"] == 0:
+            # El perfil cambió: se descarta la conexión vieja de este hilo
+            self._descartar(entrada["conn"])
+            entrada = conexiones[self.db_path] = None
+        if entrada is None:
+            conn = self.get_connection()
+            if conn is None:
+                yield None
+                return
+            entrada = conexiones[self.db_path] = {
+                "conn": conn, "prestamos": 0, "generacion": DatabaseManager._pool_generacion, "unidad": None,
+            }
+            with DatabaseManager._pool_lock:
+                DatabaseManager._pool_fallos += 1
+                DatabaseManager._pool_conexiones.append(conn)
+        else:
+            with DatabaseManager._pool_lock:
+                DatabaseManager._pool_aciertos += 1
+
+        conn = entrada["conn"]
+        entrada["prestamos"] += 1
+        try:
+            yield conn
         finally:
+            entrada["prestamos"] -= 1
+            if entrada["prestamos"] == 0 and conn.in_transaction:
+                conn.rollback()
+
+    def _entrada_actual(self):
+        conexiones = getattr(self._pool_local, "conexiones", None) or {}
+        return conexiones.get(self.db_path)
+
+    @contextmanager
+    def unidad_de_trabajo(self):
+        """Agrupa varias llamadas a controladores en una sola transacción.
+
+        Abre BEGIN IMMEDIATE (bloqueo de escritura desde el inicio, así otra
+        terminal no puede colarse entre una verificación y un INSERT) y los
+        controladores que corran dentro comparten la conexión: sus
+        confirmar() se posponen al final y un revertir() anula todo.
+        Una unidad anidada se suma a la externa.
+        """
+        with self.conexion() as conn:
+            if conn is None:
+                yield None
+                return
+            entrada = self._entrada_actual()
+            if entrada.get("unidad") is not None:
+                yield conn
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            entrada["unidad"] = unidad = {"fallida": False, "tras_confirmar": []}
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                if unidad["fallida"]:
+                    conn.rollback()
+                else:
+                    conn.commit()
+                    self._contar_escritura()
+                    for funcion in unidad["tras_confirmar"]:
+                        funcion()
+            finally:
+                entrada["unidad"] = None
+
+    def confirmar(self, conn):
+        """commit(), salvo dentro de una unidad de trabajo (confirma ella al final)."""
+        entrada = self._entrada_actual()
+        if entrada is not None and entrada["conn"] is conn and entrada.get("unidad") is not None:
+            return
+        conn.commit()
+        self._contar_escritura()
+
+    @classmethod
+    def _contar_escritura(cls):
+        with cls._pool_lock:
+            cls._escrituras += 1
+
+    @classmethod
+    def contador_escrituras(cls):
+        """Cuántas escrituras confirmó este proceso; si cambió, lo leído antes puede estar viejo."""
+        return cls._escrituras
+
+    def tras_confirmar(self, conn, funcion):
+        """Corre funcion() cuando lo escrito en conn ya está confirmado.
+
+        Fuera de una unidad de trabajo eso es ahora (llamar después de
+        confirmar); dentro, al confirmar la unidad, y nunca si se revierte.
+        """
+        entrada = self._entrada_actual()
+        if entrada is not None and entrada["conn"] is conn and entrada.get("unidad") is not None:
+            entrada["unidad"]["tras_confirmar"].append(funcion)
+            return
+        funcion()
+
+    def revertir(self, conn):
+        """rollback(); dentro de una unidad de trabajo la marca para revertirla entera."""
+        entrada = self._entrada_actual()
+        if entrada is not None and entrada["conn"] is conn and entrada.get("unidad") is not None:
+            entrada["unidad"]["fallida"] = True
+            return
+        conn.rollback()
+
+    @classmethod
+    def estadisticas_pool(cls):
+        """Aciertos/fallos del pool y conexiones abiertas."""
+        with cls._pool_lock:
+            return {
+                "aciertos": cls._pool_aciertos,
+                "fallos": cls._pool_fallos,
+                "conexiones_abiertas": len(cls._pool_conexiones),
+            }
+
+    @classmethod
+    def _descartar(cls, conn):
+        with cls._pool_lock:
+            if conn in cls._pool_conexiones:
+                cls._pool_conexiones.remove(conn)
+        try:
             conn.close()
+        except sqlite3.Error:
+            pass
+
+    @classmethod
+    def cerrar_conexiones(cls):
+        """Cierra todas las conexiones del pool (al salir de la app)."""
+        with cls._pool_lock:
+            conexiones = cls._pool_conexiones
+            cls._pool_conexiones = []
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        cls._pool_local = threading.local()
+
+    def inicializar_db(self):
+        """Aplica en orden las migraciones pendientes según PRAGMA user_version.
+
+        Con la BD al día solo cuesta leer el pragma. Cada migración corre en
+        su propia transacción junto con el nuevo user_version: si una falla,
+        las anteriores quedan aplicadas y la próxima vez se sigue desde ella.
+        """
+        with self.conexion() as conn:
+            if conn is None: return False
+
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRACIONES):
+                return True
+
+            cursor = conn.cursor()
+            try:
+                while True:
+                    conn.execute("BEGIN IMMEDIATE")
+                    # Otra terminal pudo migrar mientras esperábamos el bloqueo
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version >= len(MIGRACIONES):
+                        conn.commit()
+                        break
+                    numero = version + 1
+                    migracion = MIGRACIONES[numero - 1]
+                    print(f"Migrando DB a la versión {numero}: {migracion.__doc__}")
+                    migracion(cursor)
+                    cursor.execute(f"PRAGMA user_version = {numero}")
+                    conn.commit()
+                print("Base de datos inicializada y migrada correctamente.")
+                return True
+
+            except sqlite3.Error as e:
+                print(f"Error al inicializar/migrar la base de datos: {e}")
+                conn.rollback()
+                return False
+
+
+# --- MIGRACIONES ---
+# Cada paso recibe un cursor dentro de la transacción y debe ser idempotente:
+# una BD anterior al versionado (user_version = 0) puede tener parte del esquema.
+
+def _migracion_esquema_base(cursor):
+    """esquema base multi-barbero"""
+    # Base: configuracion, clientes, servicios
+    cursor.execute("CREATE TABLE IF NOT EXISTS configuracion (clave TEXT PRIMARY KEY, valor TEXT NOT NULL);")
+    cursor.execute("CREATE TABLE IF NOT EXISTS clientes (id_cliente INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL, telefono TEXT, email TEXT, fecha_registro DATE DEFAULT CURRENT_DATE);")
+    cursor.execute("CREATE TABLE IF NOT EXISTS servicios (id_servicio INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL, descripcion TEXT, precio REAL NOT NULL, duracion_minutos INTEGER NOT NULL, activo INTEGER DEFAULT 1);")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS barberos (
+            id_barbero INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE,
+            activo INTEGER DEFAULT 1
+        );
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS citas (
+            id_cita INTEGER PRIMARY KEY AUTOINCREMENT, 
+            id_cliente INTEGER NOT NULL, 
+            id_servicio INTEGER NOT NULL, 
+            id_barbero INTEGER NOT NULL DEFAULT 1,
+            fecha DATE NOT NULL, 
+            hora_inicio TEXT NOT NULL, 
+            hora_fin TEXT NOT NULL, 
+            total_estimado REAL, 
+            estado TEXT DEFAULT 'Pendiente', 
+            notas TEXT, 
+            FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente), 
+            FOREIGN KEY (id_servicio) REFERENCES servicios(id_servicio),
+            FOREIGN KEY (id_barbero) REFERENCES barberos(id_barbero)
+        );
+    """)
+
+    cursor.execute("CREATE TABLE IF NOT EXISTS pagos (id_pago INTEGER PRIMARY KEY AUTOINCREMENT, id_cita INTEGER NOT NULL, monto REAL NOT NULL, metodo_pago TEXT NOT NULL, referencia TEXT, fecha_pago DATETIME DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (id_cita) REFERENCES citas(id_cita));")
+
+    # Seed básico: Ale y Fran
+    barberos_data = [("Ale",), ("Fran",)]
+    cursor.executemany("INSERT OR IGNORE INTO barberos (nombre) VALUES (?)", barberos_data)
+
+    # BD de la versión mono-barbero: citas existe sin id_barbero
+    cursor.execute("PRAGMA table_info(citas)")
+    columnas = [col[1] for col in cursor.fetchall()]
+    if 'id_barbero' not in columnas:
+        cursor.execute("ALTER TABLE citas ADD COLUMN id_barbero INTEGER NOT NULL DEFAULT 1")
+
+    # Horario por defecto
+    config_data = [("apertura", "08:00"), ("cierre", "18:00"), ("perfil_db", DatabaseManager.PERFIL_POR_DEFECTO)]
+    cursor.executemany("INSERT OR IGNORE INTO configuracion (clave, valor) VALUES (?, ?)", config_data)
+
+
+# Índices administrados: nombre -> definición. Las consultas calientes de
+# agenda y reportes dependen de ellos (ver verificar_planes.py).
+INDICES = {
+    "idx_citas_fecha_barbero": "citas(fecha, id_barbero, minuto_inicio)",
+    "idx_citas_cliente_fecha": "citas(id_cliente, fecha)",
+    "idx_citas_estado_fecha": "citas(estado, fecha)",
+    "idx_pagos_fecha": "pagos(fecha_pago)",
+    # Clave foránea: sin él, cada INSERT en citas recorre pagos entero
+    "idx_pagos_cita": "pagos(id_cita)",
+    "idx_tasas_moneda_fecha": "tasas(moneda, obtenida_en)",
+    # Listado paginado de clientes por (nombre, id_cliente)
+    "idx_clientes_nombre": "clientes(nombre)",
+}
+
+
+def _migracion_indices(cursor):
+    """índices de citas y pagos"""
+    # Una migración vieja puede correr antes de que existan las columnas que
+    # INDICES ya usa; esos índices los crea la migración que añade la columna.
+    for nombre, definicion in INDICES.items():
+        tabla, columnas = definicion.rstrip(")").split("(")
+        cursor.execute(f"PRAGMA table_info({tabla})")
+        existentes = {col[1] for col in cursor.fetchall()}
+        if all(col.strip() in existentes for col in columnas.split(",")):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {definicion}")
+    cursor.execute("ANALYZE")
+
+
+def _migracion_umbral_consultas(cursor):
+    """umbral del log de consultas lentas"""
+    cursor.execute(
+        "INSERT OR IGNORE INTO configuracion (clave, valor) VALUES ('umbral_consulta_lenta_ms', ?)",
+        (str(DatabaseManager.UMBRAL_LENTA_MS_POR_DEFECTO),),
+    )
+
+
+def _migracion_indices_fk(cursor):
+    """índice de pagos por cita"""
+    _migracion_indices(cursor)
+
+
+def _migracion_minutos_enteros(cursor):
+    """horas de citas en minutos enteros"""
+    cursor.execute("PRAGMA table_info(citas)")
+    columnas = [col[1] for col in cursor.fetchall()]
+    for columna in ("minuto_inicio", "minuto_fin"):
+        if columna not in columnas:
+            cursor.execute(f"ALTER TABLE citas ADD COLUMN {columna} INTEGER")
+
+    # 'HH:MM' -> minutos desde la medianoche; un fin < inicio cruzó la medianoche
+    cursor.execute("""
+        UPDATE citas SET
+            minuto_inicio = CAST(substr(hora_inicio, 1, 2) AS INTEGER) * 60 + CAST(substr(hora_inicio, 4, 2) AS INTEGER),
+            minuto_fin = CAST(substr(hora_fin, 1, 2) AS INTEGER) * 60 + CAST(substr(hora_fin, 4, 2) AS INTEGER)
+        WHERE minuto_inicio IS NULL OR minuto_fin IS NULL
+    """)
+    cursor.execute("UPDATE citas SET minuto_fin = minuto_fin + 1440 WHERE minuto_fin < minuto_inicio")
+
+    # El índice de agenda pasa a incluir la hora de inicio
+    cursor.execute("DROP INDEX IF EXISTS idx_citas_fecha_barbero")
+    _migracion_indices(cursor)
+
+
+def _migracion_ttl_tasa_bcv(cursor):
+    """vigencia de la tasa BCV guardada"""
+    # Minutos tras los que la tasa guardada se vuelve a consultar (ver TasaController)
+    cursor.execute("INSERT OR IGNORE INTO configuracion (clave, valor) VALUES ('tasa_bcv_ttl_min', '60')")
+
+
+def _migracion_tasas(cursor):
+    """historial de tasas BCV y tasa usada en cada pago"""
+    # Fechas en UTC (CURRENT_TIMESTAMP), igual que pagos.fecha_pago, para poder cruzarlas
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tasas (
+            id_tasa INTEGER PRIMARY KEY AUTOINCREMENT,
+            moneda TEXT NOT NULL,
+            valor REAL NOT NULL,
+            obtenida_en DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            confirmada_en DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # La última tasa guardada en configuracion pasa a ser la primera del historial
+    cursor.execute("""
+        INSERT INTO tasas (moneda, valor, obtenida_en, confirmada_en)
+        SELECT 'USD', CAST(t.valor AS REAL), datetime(f.valor, 'utc'), datetime(f.valor, 'utc')
+        FROM configuracion t JOIN configuracion f ON f.clave = 'tasa_bcv_fecha'
+        WHERE t.clave = 'tasa_bcv'
+    """)
+    cursor.execute("DELETE FROM configuracion WHERE clave IN ('tasa_bcv', 'tasa_bcv_fecha')")
+
+    cursor.execute("PRAGMA table_info(pagos)")
+    columnas = [col[1] for col in cursor.fetchall()]
+    for columna in ("tasa_bcv", "monto_bs"):
+        if columna not in columnas:
+            cursor.execute(f"ALTER TABLE pagos ADD COLUMN {columna} REAL")
+    _migracion_indices(cursor)
+
+
+# Teléfono solo con dígitos, más los 7 últimos (número sin código de área)
+# como otro término: así "0414123" y "1234567" encuentran "0414-123-4567".
+_DIGITOS_TELEFONO = (
+    "replace(replace(replace(replace(replace(replace(COALESCE({t}, ''), '-', ''), ' ', ''), "
+    "'(', ''), ')', ''), '+', ''), '.', '')"
+)
+_TERMINOS_TELEFONO = f"{_DIGITOS_TELEFONO} || ' ' || substr({_DIGITOS_TELEFONO}, -7)"
+
+
+def _migracion_busqueda_clientes(cursor):
+    """índice de búsqueda de clientes (FTS5)"""
+    # Sin FTS5 en el SQLite instalado, ClientesController busca con LIKE
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+                nombre, telefono, email, digitos,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 no disponible, la búsqueda de clientes usará LIKE: {e}")
+        return
+
+    columnas = "(rowid, nombre, telefono, email, digitos)"
+    valores = f"(NEW.id_cliente, NEW.nombre, NEW.telefono, NEW.email, {_TERMINOS_TELEFONO.format(t='NEW.telefono')})"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_insertar AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts {columnas} VALUES {valores};
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_borrar AFTER DELETE ON clientes BEGIN
+            DELETE FROM clientes_fts WHERE rowid = OLD.id_cliente;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_editar AFTER UPDATE OF nombre, telefono, email ON clientes BEGIN
+            DELETE FROM clientes_fts WHERE rowid = OLD.id_cliente;
+            INSERT INTO clientes_fts {columnas} VALUES {valores};
+        END
+    """)
+
+    cursor.execute("DELETE FROM clientes_fts")
+    cursor.execute(f"""
+        INSERT INTO clientes_fts {columnas}
+        SELECT id_cliente, nombre, telefono, email, {_TERMINOS_TELEFONO.format(t="telefono")} FROM clientes
+    """)
+    cursor.execute("INSERT INTO clientes_fts (clientes_fts) VALUES ('optimize')")
+
+
+def _migracion_indice_clientes(cursor):
+    """índice de clientes por nombre"""
+    _migracion_indices(cursor)
+
+
+def _migracion_estadisticas_clientes(cursor):
+    """estadísticas acumuladas por cliente"""
+    # Visitas = citas pagadas. Los triggers ajustan los contadores en la misma
+    # transacción que cambia la cita, así nunca quedan desfasados.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clientes_estadisticas (
+            id_cliente INTEGER PRIMARY KEY REFERENCES clientes(id_cliente),
+            visitas INTEGER NOT NULL DEFAULT 0,
+            total_gastado REAL NOT NULL DEFAULT 0,
+            ultima_visita DATE,
+            canceladas INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clientes_barberos (
+            id_cliente INTEGER NOT NULL,
+            id_barbero INTEGER NOT NULL,
+            visitas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (id_cliente, id_barbero)
+        ) WITHOUT ROWID
+    """)
+
+    # Cuerpos reutilizables: {f} es NEW u OLD
+    sumar = """
+        INSERT INTO clientes_estadisticas (id_cliente, visitas, total_gastado, ultima_visita)
+        SELECT {f}.id_cliente, 1, COALESCE({f}.total_estimado, 0), {f}.fecha WHERE {f}.estado = 'Pagada'
+        ON CONFLICT (id_cliente) DO UPDATE SET
+            visitas = visitas + 1,
+            total_gastado = total_gastado + excluded.total_gastado,
+            ultima_visita = max(COALESCE(ultima_visita, ''), excluded.ultima_visita);
+        INSERT INTO clientes_barberos (id_cliente, id_barbero, visitas)
+        SELECT {f}.id_cliente, {f}.id_barbero, 1 WHERE {f}.estado = 'Pagada'
+        ON CONFLICT (id_cliente, id_barbero) DO UPDATE SET visitas = visitas + 1;
+        INSERT INTO clientes_estadisticas (id_cliente, canceladas)
+        SELECT {f}.id_cliente, 1 WHERE {f}.estado = 'Cancelada'
+        ON CONFLICT (id_cliente) DO UPDATE SET canceladas = canceladas + 1;
+    """
+    restar = """
+        UPDATE clientes_estadisticas SET
+            visitas = visitas - 1,
+            total_gastado = total_gastado - COALESCE({f}.total_estimado, 0),
+            ultima_visita = (
+                SELECT max(fecha) FROM citas
+                WHERE id_cliente = {f}.id_cliente AND estado = 'Pagada' AND id_cita != {f}.id_cita
+            )
+        WHERE id_cliente = {f}.id_cliente AND {f}.estado = 'Pagada';
+        UPDATE clientes_barberos SET visitas = visitas - 1
+        WHERE id_cliente = {f}.id_cliente AND id_barbero = {f}.id_barbero AND {f}.estado = 'Pagada';
+        DELETE FROM clientes_barberos
+        WHERE id_cliente = {f}.id_cliente AND id_barbero = {f}.id_barbero AND visitas <= 0;
+        UPDATE clientes_estadisticas SET canceladas = canceladas - 1
+        WHERE id_cliente = {f}.id_cliente AND {f}.estado = 'Cancelada';
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS citas_estadisticas_insertar AFTER INSERT ON citas
+        WHEN NEW.estado IN ('Pagada', 'Cancelada') BEGIN {sumar.format(f="NEW")} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS citas_estadisticas_borrar AFTER DELETE ON citas
+        WHEN OLD.estado IN ('Pagada', 'Cancelada') BEGIN {restar.format(f="OLD")} END
+    """)
+    # Pagar, cancelar o reasignar: se descuenta la cita vieja y se suma la nueva
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS citas_estadisticas_editar
+        AFTER UPDATE OF estado, id_cliente, id_barbero, fecha, total_estimado ON citas
+        WHEN OLD.estado IN ('Pagada', 'Cancelada') OR NEW.estado IN ('Pagada', 'Cancelada') BEGIN
+            {restar.format(f="OLD")} {sumar.format(f="NEW")}
+        END
+    """)
+
+    # Carga inicial desde las citas existentes
+    cursor.execute("DELETE FROM clientes_estadisticas")
+    cursor.execute("DELETE FROM clientes_barberos")
+    cursor.execute("""
+        INSERT INTO clientes_estadisticas (id_cliente, visitas, total_gastado, ultima_visita, canceladas)
+        SELECT id_cliente,
+               SUM(estado = 'Pagada'),
+               COALESCE(SUM(CASE WHEN estado = 'Pagada' THEN total_estimado END), 0),
+               MAX(CASE WHEN estado = 'Pagada' THEN fecha END),
+               SUM(estado = 'Cancelada')
+        FROM citas
+        WHERE estado IN ('Pagada', 'Cancelada')
+        GROUP BY id_cliente
+    """)
+    cursor.execute("""
+        INSERT INTO clientes_barberos (id_cliente, id_barbero, visitas)
+        SELECT id_cliente, id_barbero, COUNT(*) FROM citas WHERE estado = 'Pagada' GROUP BY id_cliente, id_barbero
+    """)
+
+
+def _migracion_citas_sin_duracion(cursor):
+    """citas sin duración vuelven a no ocupar tiempo"""
+    # La versión 5 tomaba hora_fin == hora_inicio como una cita de 24 horas
+    cursor.execute("""
+        UPDATE citas SET minuto_fin = minuto_inicio
+        WHERE minuto_fin = minuto_inicio + 1440 AND hora_fin = hora_inicio
+    """)
+
+
+def _migracion_cambios_agenda(cursor):
+    """registro de fechas de agenda modificadas"""
+    # Lo escriben los triggers, en la misma transacción que el cambio: así
+    # cache_agenda sabe qué fechas tocó cualquier proceso sin confundirlas
+    # con escrituras en otras tablas. fecha NULL = afecta a todas.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agenda_cambios (
+            version INTEGER PRIMARY KEY,
+            fecha DATE
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS citas_agenda_insertar AFTER INSERT ON citas BEGIN
+            INSERT INTO agenda_cambios (fecha) VALUES (NEW.fecha);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS citas_agenda_borrar AFTER DELETE ON citas BEGIN
+            INSERT INTO agenda_cambios (fecha) VALUES (OLD.fecha);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS citas_agenda_editar AFTER UPDATE ON citas BEGIN
+            INSERT INTO agenda_cambios (fecha) VALUES (NEW.fecha);
+            INSERT INTO agenda_cambios (fecha) SELECT OLD.fecha WHERE OLD.fecha IS NOT NEW.fecha;
+        END
+    """)
+    # La agenda muestra los nombres de cliente, barbero y servicio
+    for tabla in ("clientes", "barberos", "servicios"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabla}_agenda_nombre AFTER UPDATE OF nombre ON {tabla}
+            WHEN OLD.nombre IS NOT NEW.nombre BEGIN
+                INSERT INTO agenda_cambios (fecha) VALUES (NULL);
+            END
+        """)
+    # Solo hacen falta los cambios recientes; un cache más atrasado se vacía entero
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS agenda_cambios_podar AFTER INSERT ON agenda_cambios
+        WHEN NEW.version % 100 = 0 BEGIN
+            DELETE FROM agenda_cambios WHERE version <= NEW.version - 1000;
+        END
+    """)
+
+
+# Orden definitivo: la posición (1..N) es el user_version que deja cada paso.
+# Nunca reordenar ni borrar; los cambios nuevos se agregan al final.
+MIGRACIONES = [
+    _migracion_esquema_base,
+    _migracion_indices,
+    _migracion_umbral_consultas,
+    _migracion_indices_fk,
+    _migracion_minutos_enteros,
+    _migracion_ttl_tasa_bcv,
+    _migracion_tasas,
+    _migracion_busqueda_clientes,
+    _migracion_indice_clientes,
+    _migracion_estadisticas_clientes,
+    _migracion_citas_sin_duracion,
+    _migracion_cambios_agenda,
+]
 
 if __name__ == "__main__":
     db = DatabaseManager()
-    db.inicializar_db()
\ No newline at end of file
+    db.inicializar_db()
+    # Uso: python database.py [perfil]  -> cambia el perfil; sin argumento lo muestra
+    if len(sys.argv) > 1 and not db.establecer_perfil(sys.argv[1]):
+        print(f"Perfil desconocido: {sys.argv[1]} (disponibles: {', '.join(db.PERFILES)})")
+    nombre, pragmas = db.perfil_activo()
+    print(f"Perfil de BD activo: {nombre}")
+    for pragma, valor in pragmas.items():
+        print(f"  {pragma} = {valor}")
\ No newline at end of file
@@ -1,9 +1,19 @@
+import os
 import sys
+from arranque import PerfilImportaciones, linea_de_tiempo, ENTORNO_SALIR
+
+# Antes de importar Qt y las vistas, para que el perfil también las mida
+perfil_importaciones = PerfilImportaciones.si_se_pidio()
+
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox  # <-- ¡Añadidos estos dos!
 from database import DatabaseManager
+from cache_agenda import cerrar_caches
+from tareas import detener_pool_bd
 from views.main_view import MainView
 
+linea_de_tiempo.marcar("imports")
+
 def main():
     """Arranca la app, valida la BD y abre el dashboard."""
     app = QApplication(sys.argv)
@@ -17,9 +27,26 @@ def main():
         error_box.setInformativeText("Verifique los permisos de escritura.")
         error_box.exec()
         sys.exit(1)
+    linea_de_tiempo.marcar("db_init")
 
     ventana_principal = MainView()
+    linea_de_tiempo.marcar("ventana_creada")
+
+    # Al salir: detener el servicio BCV y las tareas en segundo plano,
+    # resumen de latencias al log de consultas y cierre del pool (en ese
+    # orden: Qt respeta el de conexión)
+    app.aboutToQuit.connect(ventana_principal.detener_servicio_bcv)
+    app.aboutToQuit.connect(detener_pool_bd)
+    app.aboutToQuit.connect(db_manager.registrar_resumen_metricas)
+    app.aboutToQuit.connect(DatabaseManager.cerrar_conexiones)
+    app.aboutToQuit.connect(cerrar_caches)
+
+    linea_de_tiempo.marcar_primer_pintado(ventana_principal)
+    if os.environ.get(ENTORNO_SALIR) == "1":
+        linea_de_tiempo.al_completar = app.quit
     ventana_principal.showMaximized()
+    if perfil_importaciones:
+        perfil_importaciones.imprimir()
 
     sys.exit(app.exec()) # En Qt6 es .exec() sin guion bajo
 
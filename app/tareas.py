@@ -0,0 +1,130 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class _SenalesTarea(QObject):
+    """QRunnable no es QObject: las señales viven en este acompañante."""
+    terminada = Signal(object, object)  # (tarea, resultado)
+    fallida = Signal(object, str)       # (tarea, mensaje)
+
+
+class _Tarea(QRunnable):
+    """Ejecuta una llamada a un controlador dentro del pool de hilos."""
+
+    def __init__(self, funcion, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)  # La referencia la mantiene el EjecutorTareas
+        self.funcion = funcion
+        self.clave = None
+        self.al_terminar = None
+        self.al_fallar = None
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelada = False
+        self.senales = _SenalesTarea()
+
+    def run(self):
+        # Siempre se emite algo para que el ejecutor suelte su referencia;
+        # él decide si el resultado sigue vigente.
+        if self.cancelada:
+            self.senales.terminada.emit(self, None)
+            return
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            self.senales.fallida.emit(self, str(e))
+            return
+        self.senales.terminada.emit(self, resultado)
+
+
+_pool_bd = None
+
+
+def pool_bd():
+    """Pool compartido para acceso a BD.
+
+    Sus hilos no expiran: cada uno conserva su conexión persistente del
+    DatabaseManager, así que reciclarlos abriría conexiones nuevas.
+    """
+    global _pool_bd
+    if _pool_bd is None:
+        _pool_bd = QThreadPool()
+        _pool_bd.setMaxThreadCount(3)
+        _pool_bd.setExpiryTimeout(-1)
+    return _pool_bd
+
+
+def detener_pool_bd():
+    """Al salir: descarta lo encolado y espera lo que ya corre.
+
+    Va antes de DatabaseManager.cerrar_conexiones, para no cerrar una
+    conexión que una tarea todavía está usando.
+    """
+    if _pool_bd is not None:
+        _pool_bd.clear()
+        _pool_bd.waitForDone()
+
+
+class EjecutorTareas(QObject):
+    """
+    Corre llamadas a controladores fuera del hilo de la GUI y entrega el
+    resultado en él. Cada llamada va bajo una clave: una nueva con la misma
+    clave reemplaza a la anterior, cuyo resultado se descarta.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._vigentes = {}
+        self._en_pool = set()  # Referencias vivas mientras el pool las ejecuta
+
+    def ejecutar(self, clave, funcion, *args, al_terminar=None, al_fallar=None, **kwargs):
+        """Encola funcion(*args, **kwargs); al_terminar(resultado) corre en el hilo de la GUI."""
+        self.cancelar(clave)
+        tarea = _Tarea(funcion, args, kwargs)
+        tarea.clave = clave
+        tarea.al_terminar = al_terminar
+        tarea.al_fallar = al_fallar
+        # Slots propios (no lambdas): si la vista se destruye, Qt desconecta solo
+        tarea.senales.terminada.connect(self._al_terminar)
+        tarea.senales.fallida.connect(self._al_fallar)
+        self._vigentes[clave] = tarea
+        self._en_pool.add(tarea)
+        pool_bd().start(tarea)
+        return tarea
+
+    def cancelar(self, clave):
+        """Descarta la tarea vigente de `clave` (si aún no empezó, ni siquiera corre)."""
+        tarea = self._vigentes.pop(clave, None)
+        if tarea is not None:
+            tarea.cancelada = True
+            if pool_bd().tryTake(tarea):
+                self._en_pool.discard(tarea)
+
+    def cancelar_todas(self):
+        for clave in list(self._vigentes):
+            self.cancelar(clave)
+
+    def en_curso(self, clave):
+        return clave in self._vigentes
+
+    @Slot(object, object)
+    def _al_terminar(self, tarea, resultado):
+        if self._es_vigente(tarea) and tarea.al_terminar:
+            tarea.al_terminar(resultado)
+
+    @Slot(object, str)
+    def _al_fallar(self, tarea, mensaje):
+        if not self._es_vigente(tarea):
+            return
+        if tarea.al_fallar:
+            tarea.al_fallar(mensaje)
+        else:
+            print(f"Error en tarea '{tarea.clave}': {mensaje}")
+
+    def _es_vigente(self, tarea):
+        self._en_pool.discard(tarea)
+        if tarea.cancelada:
+            return False
+        if self._vigentes.get(tarea.clave) is not tarea:
+            return False  # Superada por una llamada más reciente
+        del self._vigentes[tarea.clave]
+        return True
@@ -0,0 +1,163 @@
+"""
+Chequeo del cliente del BCV contra un servidor local que imita al BCV.
+
+El servidor sirve las páginas de fixtures/bcv/ y puede fallar a propósito
+(/fallar/N/<página>: las primeras N respuestas son 503). Se verifica que
+el cliente reuse la conexión (keep-alive), reintente los 5xx con espera
+creciente, no reintente los 4xx y dé las tasas esperadas.
+
+Uso:  py verificar_bcv.py                  (código de salida 1 si algo falla)
+      py verificar_bcv.py --servir 8765    (solo el servidor, para la app:
+      BARBERIA_URL_BCV=http://127.0.0.1:8765/clasica.html py main.py)
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from controllers.cliente_bcv import ClienteBCV
+
+CARPETA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bcv")
+
+
+class ServidorBCVLocal(ThreadingHTTPServer):
+    """Servidor de fixtures que cuenta peticiones y conexiones TCP abiertas."""
+
+    daemon_threads = True
+
+    def __init__(self, puerto=0):
+        super().__init__(("127.0.0.1", puerto), _ManejadorBCV)
+        self.peticiones = 0
+        self.conexiones = 0
+        self.fallos_pendientes = {}  # ruta -> 503 que faltan por dar
+        self._lock = threading.Lock()
+
+    def url(self, ruta):
+        return f"http://127.0.0.1:{self.server_address[1]}/{ruta.lstrip('/')}"
+
+    def reiniciar_cuentas(self):
+        with self._lock:
+            self.peticiones = self.conexiones = 0
+            self.fallos_pendientes.clear()
+
+
+class _ManejadorBCV(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.conexiones += 1
+
+    def do_GET(self):
+        ruta = self.path.lstrip("/")
+        with self.server._lock:
+            self.server.peticiones += 1
+            if ruta.startswith("fallar/"):
+                _, veces, ruta_real = ruta.split("/", 2)
+                pendientes = self.server.fallos_pendientes.setdefault(ruta, int(veces))
+                if pendientes > 0:
+                    self.server.fallos_pendientes[ruta] = pendientes - 1
+                    self._responder(503, b"mantenimiento")
+                    return
+                ruta = ruta_real
+        archivo = os.path.join(CARPETA_FIXTURES, os.path.basename(ruta))
+        if not ruta.endswith(".html") or not os.path.exists(archivo):
+            self._responder(404, b"no existe")
+            return
+        with open(archivo, "rb") as f:
+            self._responder(200, f.read())
+
+    def _responder(self, codigo, cuerpo):
+        self.send_response(codigo)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def verificar(servidor):
+    """Lista de fallos (vacía si todo bien)."""
+    with open(os.path.join(CARPETA_FIXTURES, "esperado.json"), encoding="utf-8") as archivo:
+        esperado = json.load(archivo)
+    fallos = []
+    esperas = []
+
+    def cliente(ruta, intentos=4):
+        return ClienteBCV(servidor.url(ruta), intentos=intentos, espera_base_s=0.01, dormir=esperas.append)
+
+    # 1) Varias consultas con la misma sesión: una sola conexión
+    servidor.reiniciar_cuentas()
+    c = cliente("clasica.html")
+    for _ in range(3):
+        if c.obtener_tasas() != esperado["clasica.html"]:
+            fallos.append("clasica.html: tasas distintas a las esperadas")
+    c.cerrar()
+    if servidor.conexiones != 1:
+        fallos.append(f"keep-alive: 3 consultas abrieron {servidor.conexiones} conexiones")
+
+    # 2) Dos 503 seguidos: tercer intento bueno, esperas crecientes
+    servidor.reiniciar_cuentas()
+    esperas.clear()
+    c = cliente("fallar/2/tasas_al_final.html")
+    tasas = c.obtener_tasas()
+    c.cerrar()
+    if tasas != esperado["tasas_al_final.html"] or servidor.peticiones != 3 or len(esperas) != 2:
+        fallos.append(f"reintentos: {servidor.peticiones} peticiones, {len(esperas)} esperas")
+    if any(espera > 0.01 * 2 ** i for i, espera in enumerate(esperas)):
+        fallos.append(f"reintentos: esperas fuera del tope exponencial {esperas}")
+
+    # 3) Un 404 no se reintenta
+    servidor.reiniciar_cuentas()
+    c = cliente("no_existe.html")
+    try:
+        c.obtener_tasas()
+        fallos.append("404: no lanzó error")
+    except Exception:
+        if servidor.peticiones != 1:
+            fallos.append(f"404: se reintentó ({servidor.peticiones} peticiones)")
+    c.cerrar()
+
+    # 4) Siempre 503: se rinde tras los intentos configurados
+    servidor.reiniciar_cuentas()
+    c = cliente("fallar/99/clasica.html", intentos=3)
+    try:
+        c.obtener_tasas()
+        fallos.append("503 persistente: no lanzó error")
+    except Exception:
+        if servidor.peticiones != 3:
+            fallos.append(f"503 persistente: {servidor.peticiones} peticiones en vez de 3")
+    c.cerrar()
+    return fallos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba el cliente del BCV contra un servidor local.")
+    parser.add_argument("--servir", type=int, metavar="PUERTO", help="solo levantar el servidor")
+    args = parser.parse_args()
+
+    if args.servir:
+        servidor = ServidorBCVLocal(args.servir)
+        print(f"Sirviendo fixtures/bcv/ en {servidor.url('clasica.html')} (Ctrl+C para salir)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    servidor = ServidorBCVLocal()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        fallos = verificar(servidor)
+    finally:
+        servidor.shutdown()
+    for fallo in fallos:
+        print(f"FALLO: {fallo}")
+    if fallos:
+        sys.exit(1)
+    print("OK: sesión reutilizada, reintentos con espera creciente y tasas esperadas.")
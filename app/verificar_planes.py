@@ -0,0 +1,122 @@
+"""
+Chequeo de regresión de planes de consulta.
+
+Ejecuta las consultas calientes de agenda y reportes capturando el SQL real
+que emiten los controladores y revisa su EXPLAIN QUERY PLAN: ninguna debe
+recorrer completas las tablas grandes (citas, pagos).
+
+Corre sobre una copia temporal de la BD (migrada ahí si hace falta): el
+archivo real de la recepción no se toca.
+
+Uso:  py verificar_planes.py [--bd RUTA]   (código de salida 1 si alguna hace SCAN)
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from cache_agenda import cerrar_caches
+from database import DatabaseManager, ENTORNO_RUTA_BD, copiar_bd
+from controllers.citas_controller import CitasController
+from controllers.clientes_controller import ClientesController
+from controllers.reportes_controller import ReportesController
+
+TABLAS_GRANDES = {"citas", "pagos", "clientes"}
+
+
+def consultas_calientes():
+    """[(nombre, callable)] de las lecturas que deben ir por índice."""
+    hoy = date.today().isoformat()
+    hace_un_mes = (date.today() - timedelta(days=30)).isoformat()
+    citas = CitasController()
+    clientes = ClientesController()
+    reportes = ReportesController()
+    return [
+        ("obtener_citas_por_fecha", lambda: citas._consultar_citas_por_fecha(hoy)),
+        ("obtener_citas_rango", lambda: citas._consultar_citas_fechas([hoy, (date.today() + timedelta(days=6)).isoformat()])),
+        ("hay_solapamiento", lambda: citas.hay_solapamiento(hoy, "09:00", "09:30", 1)),
+        ("listar_pagina", lambda: clientes.listar_pagina((0, "M", None, None))),
+        ("buscar_clientes", lambda: clientes.buscar_clientes("jose")),
+        ("obtener_historial_cliente", lambda: clientes.obtener_historial_cliente(1)),
+        ("obtener_estadisticas_cliente", lambda: clientes.obtener_estadisticas_cliente(1)),
+        ("obtener_cierre_diario", lambda: reportes.obtener_cierre_diario(hoy)),
+        ("obtener_comisiones", lambda: reportes.obtener_comisiones(hace_un_mes, hoy)),
+        ("obtener_ingresos_semana", reportes.obtener_ingresos_semana),
+        ("obtener_top_servicios", reportes.obtener_top_servicios),
+        ("obtener_rendimiento_barberos_mes", reportes.obtener_rendimiento_barberos_mes),
+        ("obtener_kpis_hoy", reportes.obtener_kpis_hoy),
+    ]
+
+
+def _alias_de_tablas(sql):
+    """{alias_o_nombre: tabla} a partir de las cláusulas FROM/JOIN."""
+    alias = {}
+    palabras_clave = {"WHERE", "JOIN", "ON", "GROUP", "ORDER", "LIMIT", "LEFT", "INNER"}
+    for tabla, nombre in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.IGNORECASE):
+        alias[tabla] = tabla
+        if nombre and nombre.upper() not in palabras_clave:
+            alias[nombre] = tabla
+    return alias
+
+
+def escaneos_completos(conn, sql):
+    """Líneas del plan que recorren completa una tabla grande."""
+    alias = _alias_de_tablas(sql)
+    problemas = []
+    for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        detalle = fila[-1]
+        match = re.match(r"SCAN (\w+)", detalle)
+        if match and alias.get(match.group(1), match.group(1)) in TABLAS_GRANDES:
+            problemas.append(detalle)
+    return problemas
+
+
+def verificar(db=None):
+    """Retorna {nombre_consulta: [detalles con SCAN]} (vacío si todo usa índices)."""
+    db = db or DatabaseManager()
+    fallos = {}
+    with db.conexion() as conn:
+        capturadas = []
+        conn.set_trace_callback(capturadas.append)
+        try:
+            for nombre, consulta in consultas_calientes():
+                capturadas.clear()
+                consulta()
+                for sql in capturadas:
+                    if not sql.lstrip().upper().startswith("SELECT"):
+                        continue
+                    problemas = escaneos_completos(conn, sql)
+                    if problemas:
+                        fallos.setdefault(nombre, []).extend(problemas)
+        finally:
+            conn.set_trace_callback(None)
+    return fallos
+
+
+def _informar(fallos):
+    if not fallos:
+        print("OK: todas las consultas calientes usan índices.")
+        return 0
+    for nombre, detalles in fallos.items():
+        print(f"FALLO {nombre}:")
+        for detalle in detalles:
+            print(f"    {detalle}")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Revisa los planes de las consultas calientes.")
+    parser.add_argument("--bd", metavar="RUTA", help="BD a copiar (por defecto la de la app)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.environ[ENTORNO_RUTA_BD] = copiar_bd(os.path.join(carpeta, "barberia.db"), args.bd)
+        db = DatabaseManager()
+        try:
+            codigo = _informar(verificar(db)) if db.inicializar_db() else 2
+        finally:
+            cerrar_caches()
+            DatabaseManager.cerrar_conexiones()
+    sys.exit(codigo)
@@ -8,6 +8,7 @@ from PySide6.QtGui import QIntValidator
 from textwrap import fill
 from controllers.citas_controller import CitasController
 from controllers.barberos_controller import BarberosController
+from views.selector_cliente import SelectorCliente
 
 class AgendarCitaView(QDialog):
     """
@@ -58,9 +59,8 @@ class AgendarCitaView(QDialog):
 
         self.layout_principal.addSpacing(10)
         self.layout_principal.addWidget(QLabel("<b>2. Seleccionar Cliente:</b>"))
-        self.combo_clientes = QComboBox()
-        self.combo_clientes.setEditable(True)
-        self.layout_principal.addWidget(self.combo_clientes)
+        self.selector_cliente = SelectorCliente(excluir_nombre="Público General")
+        self.layout_principal.addWidget(self.selector_cliente)
 
         self.layout_principal.addSpacing(10)
         self.layout_principal.addWidget(QLabel("<b>3. Seleccionar Servicio:</b>"))
@@ -129,6 +129,17 @@ class AgendarCitaView(QDialog):
         layout_tiempo.addLayout(layout_hora)
         self.layout_principal.addLayout(layout_tiempo)
 
+        # Sugerencias calculadas con el mapa de disponibilidad del barbero
+        layout_libres = QHBoxLayout()
+        layout_libres.addWidget(QLabel("Próximos libres:"))
+        self.combo_libres = QComboBox()
+        self.combo_libres.activated.connect(self.usar_horario_libre)
+        layout_libres.addWidget(self.combo_libres, 1)
+        self.layout_principal.addLayout(layout_libres)
+
+        self.combo_barberos.currentIndexChanged.connect(self.actualizar_horarios_libres)
+        self.date_edit.dateChanged.connect(self.actualizar_horarios_libres)
+
         self.layout_principal.addStretch()
         frame_resumen = QFrame()
         frame_resumen.setObjectName("resumen")
@@ -162,11 +173,6 @@ class AgendarCitaView(QDialog):
         for b in barberos:
             self.combo_barberos.addItem(f"✂️ {b[1]}", b[0])
 
-        clientes = self.controller.obtener_clientes()
-        self.combo_clientes.addItem("-- Seleccione Cliente --", None)
-        for c in clientes:
-            self.combo_clientes.addItem(c[1], c[0])
-
         servicios = self.controller.obtener_servicios_activos()
         row, col = 0, 0
         max_cols = 3 
@@ -205,6 +211,42 @@ class AgendarCitaView(QDialog):
     def servicio_clickeado(self, btn):
         self.servicio_seleccionado = btn.data_servicio
         self.actualizar_resumen()
+        self.actualizar_horarios_libres()
+
+    def actualizar_horarios_libres(self):
+        """Ofrece las próximas horas libres del barbero para el servicio elegido."""
+        self.combo_libres.clear()
+        id_barbero = self.combo_barberos.currentData()
+        if not id_barbero or not self.servicio_seleccionado:
+            self.combo_libres.addItem("Seleccione barbero y servicio", None)
+            return
+
+        fecha_str = self.date_edit.date().toString("yyyy-MM-dd")
+        opciones = self.controller.proximos_horarios_libres(fecha_str, id_barbero, self.servicio_seleccionado[3])
+        if not opciones:
+            self.combo_libres.addItem("Sin horarios libres esta semana", None)
+            return
+        for fecha, hora in opciones:
+            hora_qt = QTime.fromString(hora, "HH:mm")
+            texto = hora_qt.toString("hh:mm AP")
+            if fecha != fecha_str:
+                texto = f"{QDate.fromString(fecha, 'yyyy-MM-dd').toString('dd/MM')} {texto}"
+            self.combo_libres.addItem(texto, (fecha, hora))
+
+    def usar_horario_libre(self, indice):
+        """Copia la sugerencia elegida a la fecha y a los campos de hora."""
+        datos = self.combo_libres.itemData(indice)
+        if not datos:
+            return
+        fecha, hora = datos
+        hora_qt = QTime.fromString(hora, "HH:mm")
+        hora_12 = hora_qt.hour() % 12 or 12
+        self.date_edit.blockSignals(True)
+        self.date_edit.setDate(QDate.fromString(fecha, "yyyy-MM-dd"))
+        self.date_edit.blockSignals(False)
+        self.txt_hora.setText(f"{hora_12:02d}")
+        self.txt_minutos.setText(f"{hora_qt.minute():02d}")
+        self.combo_ampm.setCurrentText("AM" if hora_qt.hour() < 12 else "PM")
 
     def _obtener_hora_inicio_24(self):
         hora_txt = self.txt_hora.text().strip()
@@ -243,7 +285,7 @@ class AgendarCitaView(QDialog):
     def guardar_cita(self):
         id_barbero = self.combo_barberos.currentData()
         nombre_barbero = self.combo_barberos.currentText()
-        id_cliente = self.combo_clientes.currentData()
+        id_cliente = self.selector_cliente.resolver_cliente()
         
         if not id_barbero:
             QMessageBox.warning(self, "Error", "Seleccione un barbero.")
@@ -268,18 +310,19 @@ class AgendarCitaView(QDialog):
         hora_inicio_str = hora_inicio_qtime.toString("HH:mm")
         hora_fin_str = self.controller.calcular_hora_fin(hora_inicio_str, duracion)
 
-        # Verificación de choque de agenda por barbero
-        hay_conflicto = self.controller.hay_solapamiento(fecha_str, hora_inicio_str, hora_fin_str, id_barbero)
-        
-        if hay_conflicto:
+        # Verificación de choque e inserción atómicas (otra terminal no puede colarse)
+        resultado = self.controller.agendar_cita(
+            id_cliente, id_servicio, id_barbero, fecha_str, hora_inicio_str, hora_fin_str, precio_total
+        )
+
+        if resultado.conflicto:
             QMessageBox.critical(
                 self, "Conflicto de Horario",
                 f"El barbero {nombre_barbero} ya tiene una cita ocupada en el rango {hora_inicio_str} - {hora_fin_str}."
             )
             return
 
-        exito = self.controller.crear_cita(id_cliente, id_servicio, id_barbero, fecha_str, hora_inicio_str, hora_fin_str, precio_total)
-        
+        exito = resultado.agendada
         if exito:
             QMessageBox.information(self, "Éxito", f"Cita agendada correctamente con {nombre_barbero}.")
             self.accept()
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from controllers.clientes_controller import ClientesController, LIMITE_BUSQUEDA
+from database import DatabaseManager
+from tareas import EjecutorTareas
+
+
+class BusquedaClientes(QObject):
+    """
+    Búsqueda de clientes mientras se escribe. Espera a que se deje de
+    teclear (DEMORA_MS), consulta en el pool de BD y descarta la respuesta
+    si el texto cambió mientras tanto. Los textos recientes se responden
+    desde una LRU que se vacía cuando este proceso escribe en la BD.
+    """
+    resultados = Signal(str, list)  # (texto buscado, filas de buscar_clientes)
+
+    DEMORA_MS = 250
+    TAMANO_CACHE = 32
+
+    def __init__(self, controller=None, limite=LIMITE_BUSQUEDA, parent=None):
+        super().__init__(parent)
+        self.controller = controller or ClientesController()
+        self.limite = limite
+        self.tareas = EjecutorTareas(self)
+        self._texto = ""
+        self._recientes = OrderedDict()  # texto normalizado -> filas
+        self._escrituras = DatabaseManager.contador_escrituras()
+
+        self._temporizador = QTimer(self)
+        self._temporizador.setSingleShot(True)
+        self._temporizador.timeout.connect(self._consultar)
+
+    def buscar(self, texto):
+        """Programa la búsqueda de `texto`; una llamada nueva antes de la demora reemplaza a esta."""
+        self._texto = " ".join(texto.split())
+        filas = self._en_cache(self._texto)
+        if filas is not None:
+            self.cancelar()
+            self.resultados.emit(self._texto, filas)
+            return
+        # Lo que esté en curso ya responde a un texto viejo
+        self.tareas.cancelar("busqueda")
+        self._temporizador.start(self.DEMORA_MS)
+
+    def buscar_ahora(self, texto):
+        """Sin demora (p. ej. al pulsar Enter o tras guardar un cliente)."""
+        self.buscar(texto)
+        if self._temporizador.isActive():
+            self._temporizador.stop()
+            self._consultar()
+
+    def cancelar(self):
+        self._temporizador.stop()
+        self.tareas.cancelar("busqueda")
+
+    def invalidar(self):
+        self._recientes.clear()
+
+    def _en_cache(self, texto):
+        escrituras = DatabaseManager.contador_escrituras()
+        if escrituras != self._escrituras:
+            # Algún cliente pudo cambiar: lo guardado ya no es confiable
+            self._escrituras = escrituras
+            self._recientes.clear()
+        clave = texto.casefold()
+        filas = self._recientes.get(clave)
+        if filas is not None:
+            self._recientes.move_to_end(clave)
+        return filas
+
+    def _consultar(self):
+        texto = self._texto
+        escrituras = DatabaseManager.contador_escrituras()
+        self.tareas.ejecutar(
+            "busqueda", self.controller.buscar_clientes, texto, self.limite,
+            al_terminar=lambda filas: self._recibir(texto, escrituras, filas),
+        )
+
+    def _recibir(self, texto, escrituras, filas):
+        if escrituras == DatabaseManager.contador_escrituras():
+            self._recientes[texto.casefold()] = filas
+            while len(self._recientes) > self.TAMANO_CACHE:
+                self._recientes.popitem(last=False)
+        if texto == self._texto:
+            self.resultados.emit(texto, filas)
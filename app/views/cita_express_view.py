@@ -6,6 +6,7 @@ from PySide6.QtCore import Qt, QDate
 from PySide6.QtGui import QFont, QColor
 from controllers.citas_controller import CitasController
 from controllers.barberos_controller import BarberosController
+from views.selector_cliente import SelectorCliente
 
 class CitaExpressView(QDialog):
     """Modal de Atención Inmediata (Multi-Barbero)."""
@@ -50,9 +51,8 @@ class CitaExpressView(QDialog):
         self.layout_principal.addWidget(self.combo_barberos)
 
         self.layout_principal.addWidget(QLabel("<b>Cliente:</b>"))
-        self.combo_clientes = QComboBox()
-        self.combo_clientes.setEditable(True)
-        self.layout_principal.addWidget(self.combo_clientes)
+        self.selector_cliente = SelectorCliente(excluir_nombre="Público General")
+        self.layout_principal.addWidget(self.selector_cliente)
 
         self.layout_principal.addSpacing(10)
         self.layout_principal.addWidget(QLabel("<b>Seleccionar Servicio:</b>"))
@@ -93,12 +93,8 @@ class CitaExpressView(QDialog):
         for b in self.barberos_controller.obtener_barberos_activos():
             self.combo_barberos.addItem(f"✂️ {b[1]}", b[0])
 
-        clientes = self.controller.obtener_clientes()
-        index_publico = 0
-        for i, c in enumerate(clientes):
-            self.combo_clientes.addItem(c[1], c[0])
-            if c[0] == self.id_publico_general: index_publico = i
-        if self.id_publico_general: self.combo_clientes.setCurrentIndex(index_publico)
+        if self.id_publico_general:
+            self.selector_cliente.establecer_cliente(self.id_publico_general, "Público General")
 
         for i, s in enumerate(self.controller.obtener_servicios_activos()):
             row, col = divmod(i, 2)
@@ -142,11 +138,24 @@ class CitaExpressView(QDialog):
     def procesar_cita_express(self):
         id_barbero = self.combo_barberos.currentData()
         nombre_barbero = self.combo_barberos.currentText()
-        id_cliente = self.combo_clientes.currentData()
 
         if not id_barbero: return QMessageBox.warning(self, "Error", "Seleccione barbero.")
         if not self.servicio_seleccionado: return QMessageBox.warning(self, "Error", "Seleccione servicio.")
 
+        # Campo vacío o "Público General": la atención queda a su nombre.
+        # Un nombre escrito que no es un cliente no se cambia en silencio.
+        texto_cliente = " ".join(self.selector_cliente.text().split())
+        if not texto_cliente or texto_cliente == "Público General":
+            id_cliente = self.id_publico_general
+        else:
+            id_cliente = self.selector_cliente.resolver_cliente()
+            if not id_cliente:
+                return QMessageBox.warning(
+                    self, "Error",
+                    f"\"{texto_cliente}\" no corresponde a un único cliente registrado.\n"
+                    "Elíjalo de la lista o deje el campo vacío para Público General."
+                )
+
         id_servicio = self.servicio_seleccionado[0]
         precio = self.servicio_seleccionado[2]
         duracion = self.servicio_seleccionado[3]
@@ -155,16 +164,22 @@ class CitaExpressView(QDialog):
         hora_inicio = self.controller.get_hora_actual_formateada()
         hora_fin = self.controller.calcular_hora_fin(hora_inicio, duracion)
         
-        # Chequeo de solape antes de permitir overbooking
-        if self.controller.hay_solapamiento(fecha_hoy, hora_inicio, hora_fin, id_barbero):
+        # Chequeo de solape e inserción atómicas; la pregunta de overbooking
+        # se hace después para no retener el bloqueo de escritura.
+        resultado = self.controller.agendar_cita(
+            id_cliente, id_servicio, id_barbero, fecha_hoy, hora_inicio, hora_fin, precio, notas="Cita Express"
+        )
+        exito = resultado.agendada
+
+        if resultado.conflicto:
             respuesta = QMessageBox.warning(
                 self, "Conflicto",
                 f"El barbero {nombre_barbero} ya está ocupado en este momento.\n¿Forzar atención (Overbooking)?",
                 QMessageBox.Yes | QMessageBox.No
             )
             if respuesta == QMessageBox.No: return
+            exito = self.controller.crear_cita(id_cliente, id_servicio, id_barbero, fecha_hoy, hora_inicio, hora_fin, precio, notas="Cita Express")
 
-        exito = self.controller.crear_cita(id_cliente, id_servicio, id_barbero, fecha_hoy, hora_inicio, hora_fin, precio, notas="Cita Express")
         if exito:
             QMessageBox.information(self, "Listo", "Servicio iniciado correctamente.")
             self.accept()
\ No newline at end of file
@@ -1,12 +1,14 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QDialog, QVBoxLayout, QHBoxLayout, QTableView,
     QPushButton, QLabel, QLineEdit, QMessageBox, QHeaderView, QFormLayout,
     QAbstractItemView
 )
 from PySide6.QtCore import Qt, QRegularExpression
 from PySide6.QtGui import QRegularExpressionValidator
 from controllers.clientes_controller import ClientesController
+from views.busqueda_clientes import BusquedaClientes
 from views.historial_cliente_view import HistorialClienteView
+from views.modelo_clientes import ModeloClientes
 
 class FormularioCliente(QDialog):
     """
@@ -78,6 +80,8 @@ class ClientesView(QDialog):
         self.setWindowTitle("Gestión de Clientes")
         self.resize(950, 600)
         self.controller = ClientesController()
+        self.busqueda = BusquedaClientes(self.controller, parent=self)
+        self.busqueda.resultados.connect(self._mostrar_busqueda)
         
         self.layout_principal = QVBoxLayout()
         self.setLayout(self.layout_principal)
@@ -87,14 +91,17 @@ class ClientesView(QDialog):
         self.input_buscar = QLineEdit()
         self.input_buscar.setPlaceholderText("Escriba nombre o teléfono...")
         self.input_buscar.textChanged.connect(self.cargar_datos)
+        self.input_buscar.returnPressed.connect(lambda: self.cargar_datos(inmediato=True))
         
         self.layout_busqueda.addWidget(lbl_buscar)
         self.layout_busqueda.addWidget(self.input_buscar)
         self.layout_principal.addLayout(self.layout_busqueda)
 
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(4)
-        self.tabla.setHorizontalHeaderLabels(["ID", "Nombre", "Teléfono", "Email"])
+        # Tabla virtual: las filas se piden por páginas al hacer scroll
+        self.modelo = ModeloClientes(self.controller, parent=self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.verticalHeader().setVisible(False)
         self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.tabla.setSelectionMode(QAbstractItemView.SingleSelection)
         self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -133,32 +140,36 @@ class ClientesView(QDialog):
 
         self.cargar_datos()
 
-    def cargar_datos(self):
+    def cargar_datos(self, _texto=None, inmediato=False):
+        """Búsqueda con demora y en segundo plano; sin texto, el listado paginado."""
         texto = self.input_buscar.text().strip()
         if texto:
-            clientes = self.controller.buscar_clientes(texto)
+            if inmediato:
+                self.busqueda.buscar_ahora(texto)
+            else:
+                self.busqueda.buscar(texto)
         else:
-            clientes = self.controller.listar_todos()
+            self.busqueda.cancelar()
+            self.modelo.listar()
 
-        self.tabla.setRowCount(0)
+    def _mostrar_busqueda(self, _texto, clientes):
+        self.modelo.mostrar_resultados(clientes)
 
-        for row_idx, cliente in enumerate(clientes):
-            self.tabla.insertRow(row_idx)
-            self.tabla.setItem(row_idx, 0, QTableWidgetItem(str(cliente[0])))
-            self.tabla.setItem(row_idx, 1, QTableWidgetItem(str(cliente[1])))
-            self.tabla.setItem(row_idx, 2, QTableWidgetItem(str(cliente[2] or "")))
-            self.tabla.setItem(row_idx, 3, QTableWidgetItem(str(cliente[3] or "")))
+    def _cliente_seleccionado(self):
+        """(id_cliente, nombre, telefono, email) de la fila seleccionada, o None."""
+        filas = self.tabla.selectionModel().selectedRows()
+        if not filas:
+            return None
+        return self.modelo.cliente(filas[0].row())
 
     def abrir_historial(self):
         """Abre la ventana del historial, bloqueando al Público General."""
-        seleccion = self.tabla.selectedItems()
-        if not seleccion:
+        cliente = self._cliente_seleccionado()
+        if not cliente:
             QMessageBox.warning(self, "Aviso", "Seleccione un cliente para ver su historial.")
             return
 
-        fila = seleccion[0].row()
-        id_cliente = int(self.tabla.item(fila, 0).text())
-        nombre_cliente = self.tabla.item(fila, 1).text()
+        id_cliente, nombre_cliente = cliente[0], cliente[1]
 
         # Bloqueamos al público general: es un placeholder sin historial
         if nombre_cliente == "Público General":
@@ -179,29 +190,24 @@ class ClientesView(QDialog):
             if exito:
                 QMessageBox.information(self, "Éxito", "Cliente registrado correctamente.")
                 self.input_buscar.clear()
-                self.cargar_datos()
+                self.cargar_datos(inmediato=True)
             else:
                 QMessageBox.critical(self, "Error", "No se pudo registrar el cliente.")
 
     def abrir_editar(self):
-        seleccion = self.tabla.selectedItems()
-        if not seleccion:
+        cliente = self._cliente_seleccionado()
+        if not cliente:
             QMessageBox.warning(self, "Aviso", "Seleccione un cliente para editar.")
             return
 
-        fila = seleccion[0].row()
-        id_cliente = int(self.tabla.item(fila, 0).text())
-        nombre = self.tabla.item(fila, 1).text()
+        id_cliente, nombre = cliente[0], cliente[1]
         
         # No tocar los datos del Público General
         if nombre == "Público General":
             QMessageBox.warning(self, "Acción no permitida", "No se pueden editar los datos del Público General.")
             return
 
-        telefono = self.tabla.item(fila, 2).text()
-        email = self.tabla.item(fila, 3).text()
-
-        datos_actuales = (id_cliente, nombre, telefono, email)
+        datos_actuales = (id_cliente, nombre, cliente[2] or "", cliente[3] or "")
 
         dialogo = FormularioCliente(self, cliente_data=datos_actuales)
         if dialogo.exec():
@@ -209,6 +215,6 @@ class ClientesView(QDialog):
             exito = self.controller.editar_cliente(id_cliente, *nuevos_datos)
             if exito:
                 QMessageBox.information(self, "Éxito", "Cliente actualizado correctamente.")
-                self.cargar_datos()
+                self.cargar_datos(inmediato=True)
             else:
                 QMessageBox.critical(self, "Error", "No se pudo actualizar el cliente.")
\ No newline at end of file
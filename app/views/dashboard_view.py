@@ -5,9 +5,9 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
 from controllers.reportes_controller import ReportesController
+from tareas import EjecutorTareas
 
 
 class DashboardView(QWidget):
@@ -16,6 +16,7 @@ class DashboardView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.controller = ReportesController()
+        self.tareas = EjecutorTareas(self)
         self.init_ui()
         self.cargar_datos()
     
@@ -194,9 +195,22 @@ class DashboardView(QWidget):
         return canvas
     
     def cargar_datos(self):
-        """Carga y actualiza todos los datos del dashboard."""
+        """Lanza las consultas del dashboard en segundo plano."""
+        self.tareas.ejecutar("dashboard", self._consultar_datos, al_terminar=self._mostrar_datos)
+
+    def _consultar_datos(self):
+        """Corre en el pool de hilos: solo consultas, nada de widgets."""
+        return {
+            'kpis': self.controller.obtener_kpis_hoy(),
+            'tendencia': self.controller.obtener_ingresos_semana(),
+            'barberos': self.controller.obtener_rendimiento_barberos_mes(),
+            'servicios': self.controller.obtener_top_servicios(),
+        }
+
+    def _mostrar_datos(self, datos):
+        """Actualiza KPIs y gráficos con el resultado (hilo de la GUI)."""
         # KPIs
-        kpis = self.controller.obtener_kpis_hoy()
+        kpis = datos['kpis']
         self.actualizar_kpi(self.card_ventas_hoy, f"${kpis['ventas_hoy']:.2f}")
         self.actualizar_kpi(self.card_citas_hoy, str(kpis['citas_hoy']))
         
@@ -213,16 +227,13 @@ class DashboardView(QWidget):
         self.actualizar_kpi(self.card_proyeccion_mes, f"${proyeccion:.2f}")
         
         # Gráfico de Tendencia
-        datos_tendencia = self.controller.obtener_ingresos_semana()
-        self.actualizar_grafico_tendencia(datos_tendencia)
+        self.actualizar_grafico_tendencia(datos['tendencia'])
         
         # Gráfico de Barberos
-        datos_barberos = self.controller.obtener_rendimiento_barberos_mes()
-        self.actualizar_grafico_barberos(datos_barberos)
+        self.actualizar_grafico_barberos(datos['barberos'])
         
         # Gráfico de Servicios
-        datos_servicios = self.controller.obtener_top_servicios()
-        self.actualizar_grafico_servicios(datos_servicios)
+        self.actualizar_grafico_servicios(datos['servicios'])
     
     def actualizar_kpi(self, card, valor):
         """Actualiza el valor de una tarjeta KPI."""
@@ -0,0 +1,15 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFont
+
+# Datos de rol compartidos por los modelos de tabla de citas (agenda,
+# historial): se crean una vez, no por celda, y se ven igual en ambas.
+FUENTE_BARBERO = QFont("Arial", 10, QFont.Bold)
+FUENTE_ESTADO = QFont()
+FUENTE_ESTADO.setBold(True)
+COLOR_ESTADO = {
+    'Pendiente': QColor('#FF8C00'),
+    'Pagada': QColor('green'),
+    'Cancelada': QColor('red'),
+}
+ALINEADO_DERECHA = int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+ALINEADO_CENTRO = int(Qt.AlignmentFlag.AlignCenter)
@@ -1,10 +1,11 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, 
-    QTableWidgetItem, QHeaderView, QPushButton, QFrame, QAbstractItemView
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTableView, 
+    QHeaderView, QPushButton, QFrame, QAbstractItemView
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QColor
+from PySide6.QtCore import Qt, QDate
+from PySide6.QtGui import QFont
 from controllers.clientes_controller import ClientesController
+from views.modelo_historial import ModeloHistorial
 
 class HistorialClienteView(QDialog):
     """
@@ -47,19 +48,31 @@ class HistorialClienteView(QDialog):
         self.layout_principal.addWidget(frame_header)
         self.layout_principal.addSpacing(10)
 
-        self.tabla = QTableWidget()
-        self.tabla.setColumnCount(6)
-        self.tabla.setHorizontalHeaderLabels(["Fecha", "Hora", "Servicio", "Barbero", "Precio", "Estado"])
+        # Resumen acumulado (tabla clientes_estadisticas, al día por triggers)
+        layout_resumen = QHBoxLayout()
+        self.lbl_visitas = self._crear_dato(layout_resumen, "Visitas")
+        self.lbl_total = self._crear_dato(layout_resumen, "Total gastado")
+        self.lbl_ultima = self._crear_dato(layout_resumen, "Última visita")
+        self.lbl_favorito = self._crear_dato(layout_resumen, "Barbero favorito")
+        self.layout_principal.addLayout(layout_resumen)
+        self.layout_principal.addSpacing(10)
+
+        self.tabla = QTableView()
         self.tabla.setSelectionMode(QAbstractItemView.NoSelection)
         self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tabla.verticalHeader().setVisible(False)
         self.tabla.setAlternatingRowColors(True)
 
-        header = self.tabla.horizontalHeader()
-        header.setSectionResizeMode(2, QHeaderView.Stretch)
-        
         self.layout_principal.addWidget(self.tabla)
 
+        self.lbl_vacio = QLabel("Este cliente aún no ha tomado servicios.")
+        self.lbl_vacio.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        fuente_vacio = QFont("Arial", 10)
+        fuente_vacio.setItalic(True)
+        self.lbl_vacio.setFont(fuente_vacio)
+        self.lbl_vacio.hide()
+        self.layout_principal.addWidget(self.lbl_vacio)
+
         self.layout_principal.addSpacing(10)
         btn_cerrar = QPushButton("Cerrar")
         btn_cerrar.setMinimumHeight(40)
@@ -68,42 +81,34 @@ class HistorialClienteView(QDialog):
         
         self.layout_principal.addWidget(btn_cerrar, alignment=Qt.AlignmentFlag.AlignRight)
 
+    def _crear_dato(self, layout, titulo):
+        frame = QFrame()
+        frame.setStyleSheet("background-color: #f0f0f0; border-radius: 5px;")
+        layout_dato = QVBoxLayout(frame)
+        lbl_titulo = QLabel(titulo)
+        lbl_titulo.setStyleSheet("color: #7F8C8D;")
+        lbl_valor = QLabel("-")
+        lbl_valor.setFont(QFont("Arial", 13, QFont.Bold))
+        lbl_valor.setStyleSheet("color: #2C3E50;")
+        layout_dato.addWidget(lbl_titulo)
+        layout_dato.addWidget(lbl_valor)
+        layout.addWidget(frame)
+        return lbl_valor
+
     def cargar_historial(self):
-        """Obtiene los datos del controlador y llena la tabla."""
-        citas = self.controller.obtener_historial_cliente(self.id_cliente)
-        
-        self.tabla.setRowCount(0)
+        """Resumen al instante; la tabla trae la primera página y el resto al hacer scroll."""
+        estadisticas = self.controller.obtener_estadisticas_cliente(self.id_cliente)
+        self.lbl_visitas.setText(str(estadisticas.visitas))
+        self.lbl_total.setText(f"${estadisticas.total_gastado:.2f}")
+        if estadisticas.ultima_visita:
+            self.lbl_ultima.setText(QDate.fromString(estadisticas.ultima_visita, "yyyy-MM-dd").toString("dd/MM/yyyy"))
+        self.lbl_favorito.setText(f"✂️ {estadisticas.barbero_favorito}" if estadisticas.barbero_favorito else "-")
 
-        if not citas:
-            self.tabla.setRowCount(1)
-            item_aviso = QTableWidgetItem("Este cliente aún no ha tomado servicios.")
-            item_aviso.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            item_aviso.setFont(QFont("Arial", 10, QFont.StyleItalic))
-            self.tabla.setSpan(0, 0, 1, 6)
-            self.tabla.setItem(0, 0, item_aviso)
-            return
+        self.modelo = ModeloHistorial(self.id_cliente, self.controller, parent=self)
+        self.tabla.setModel(self.modelo)
+        self.tabla.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.modelo.fetchMore()
 
-        for row_idx, cita in enumerate(citas):
-            self.tabla.insertRow(row_idx)
-            self.tabla.setItem(row_idx, 0, QTableWidgetItem(cita[0]))
-            self.tabla.setItem(row_idx, 1, QTableWidgetItem(cita[1]))
-            self.tabla.setItem(row_idx, 2, QTableWidgetItem(cita[2]))
-            item_barbero = QTableWidgetItem(f"✂️ {cita[3]}")
-            item_barbero.setFont(QFont("Arial", 9, QFont.Bold))
-            self.tabla.setItem(row_idx, 3, item_barbero)
-            item_precio = QTableWidgetItem(f"${cita[4]:.2f}")
-            item_precio.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.tabla.setItem(row_idx, 4, item_precio)
-            estado = cita[5]
-            item_estado = QTableWidgetItem(estado)
-            item_estado.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            if estado == 'Pendiente':
-                item_estado.setForeground(QColor('#FF8C00'))
-            elif estado == 'Pagada':
-                item_estado.setForeground(QColor('green'))
-            
-            font = item_estado.font()
-            font.setBold(True)
-            item_estado.setFont(font)
-            self.tabla.setItem(row_idx, 5, item_estado)
\ No newline at end of file
+        sin_citas = self.modelo.rowCount() == 0
+        self.tabla.setVisible(not sin_citas)
+        self.lbl_vacio.setVisible(sin_citas)
@@ -1,23 +1,27 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-    QLabel, QDateEdit, QTableWidget, QTableWidgetItem, QHeaderView, 
+    QLabel, QDateEdit, QTableView, QHeaderView, 
     QAbstractItemView, QFrame, QMessageBox, QMenu
 )
 # NOTA: QAction se movió a QtGui en PySide6
-from PySide6.QtGui import QColor, QFont, QAction
-from PySide6.QtCore import Qt, QDate
+from PySide6.QtGui import QFont, QAction
+from PySide6.QtCore import Qt, QDate, QTimer
 
 from controllers.citas_controller import CitasController
-from controllers.bcv_controller import BCVWorker
+from controllers.tasa_controller import TasaController
+from tareas import EjecutorTareas
+from arranque import linea_de_tiempo
 from views.servicios_view import ServiciosView
 from views.clientes_view import ClientesView
 from views.agendar_view import AgendarCitaView
 from views.pago_view import PagoView
-from views.cierre_caja_view import CierreCajaView
 from views.cita_express_view import CitaExpressView
 from views.reasignar_cliente_view import ReasignarClienteView
-from views.reporte_comisiones_view import ReporteComisionesView
-from views.dashboard_view import DashboardView
+from views.modelo_agenda import ModeloAgenda
+from views.navegacion import Navegador
+
+# Con una tasa vigente guardada, el servicio BCV arranca después de la primera agenda
+DEMORA_SERVICIO_BCV_MS = 3000
 
 class MainView(QMainWindow):
     """Dashboard Principal Multi-Barbero con Tasa BCV."""
@@ -27,11 +31,12 @@ class MainView(QMainWindow):
         self.setGeometry(100, 100, 1200, 800)
         
         self.controller = CitasController()
+        self.tareas = EjecutorTareas(self)
         self.tasa_bcv_actual = 0.0
+        self.servicio_bcv = None
         
         self.init_ui()
-        self.cargar_citas_del_dia()
-        self.iniciar_scraping_bcv()
+        self.cargar_tasa_bcv()
 
     def init_ui(self):
         central_widget = QWidget()
@@ -90,22 +95,23 @@ class MainView(QMainWindow):
 
         main_layout.addWidget(sidebar)
 
-        # Content area: inicialmente mostrará la Agenda
-        self.content_area = QWidget()
-        self.content_layout = QVBoxLayout()
-        self.content_area.setLayout(self.content_layout)
-        self.content_layout.setContentsMargins(20, 20, 20, 20)
+        # Content area: pantallas apiladas que se construyen una vez y se conservan
+        self.navegador = Navegador()
+        self.navegador.setContentsMargins(20, 20, 20, 20)
+        self.navegador.registrar("agenda", self.crear_vista_agenda, lambda _: self.cargar_citas_del_dia())
+        self.navegador.registrar("dashboard", self.crear_vista_dashboard, lambda vista: vista.cargar_datos())
         
-        main_layout.addWidget(self.content_area)
+        main_layout.addWidget(self.navegador)
         
-        # Crear vista de agenda
-        self.crear_vista_agenda()
+        # Inicialmente se muestra la Agenda
+        self.mostrar_agenda()
 
 
     def crear_vista_agenda(self):
-        """Crea la vista de agenda diaria."""
-        # Limpiar el content_layout
-        self.limpiar_content_area()
+        """Crea la pantalla de agenda diaria y carga el día actual."""
+        pagina = QWidget()
+        self.content_layout = QVBoxLayout(pagina)
+        self.content_layout.setContentsMargins(0, 0, 0, 0)
         
         header_layout = QHBoxLayout()
         lbl_agenda = QLabel("Agenda Diaria")
@@ -125,11 +131,9 @@ class MainView(QMainWindow):
         header_layout.addWidget(self.date_selector)
         self.content_layout.addLayout(header_layout)
         
-        self.tabla_citas = QTableWidget()
-        self.tabla_citas.setColumnCount(7)
-        self.tabla_citas.setHorizontalHeaderLabels([
-            "Inicio", "Fin", "Barbero", "Cliente", "Servicio", "Precio ($)", "Estado"
-        ])
+        self.modelo_citas = ModeloAgenda(self)
+        self.tabla_citas = QTableView()
+        self.tabla_citas.setModel(self.modelo_citas)
         self.tabla_citas.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.tabla_citas.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.tabla_citas.verticalHeader().setVisible(False)
@@ -137,7 +141,7 @@ class MainView(QMainWindow):
         
         self.tabla_citas.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tabla_citas.customContextMenuRequested.connect(self.mostrar_menu_contextual)
-        self.tabla_citas.cellDoubleClicked.connect(self.abrir_cobro)
+        self.tabla_citas.doubleClicked.connect(self.abrir_cobro)
         
         header = self.tabla_citas.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
@@ -146,35 +150,27 @@ class MainView(QMainWindow):
         lbl_info = QLabel("ℹ️ Doble clic para COBRAR | Click derecho para CANCELAR.")
         lbl_info.setStyleSheet("color: #666; font-style: italic;")
         self.content_layout.addWidget(lbl_info)
+
+        self.cargar_citas_del_dia()
+        return pagina
     
-    def limpiar_content_area(self):
-        """Limpia el área de contenido."""
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                self.limpiar_layout(item.layout())
-    
-    def limpiar_layout(self, layout):
-        """Limpia un layout recursivamente."""
-        while layout.count():
-            item = layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                self.limpiar_layout(item.layout())
-    
+    def crear_vista_dashboard(self):
+        # Importación diferida: matplotlib solo se carga si alguien abre el dashboard
+        from views.dashboard_view import DashboardView
+        return DashboardView(self)
+
     def mostrar_dashboard(self):
-        """Muestra el dashboard de BI."""
-        self.limpiar_content_area()
-        self.dashboard_view = DashboardView(self)
-        self.content_layout.addWidget(self.dashboard_view)
+        """Muestra el dashboard de BI (se refresca solo si sus datos están viejos)."""
+        self.navegador.mostrar("dashboard")
     
     def mostrar_agenda(self):
         """Muestra la vista de agenda."""
-        self.crear_vista_agenda()
-        self.cargar_citas_del_dia()
+        self.navegador.mostrar("agenda")
+
+    def _refrescar_agenda(self):
+        """Tras un diálogo: recarga si la agenda está a la vista; si no, quedará vieja para la próxima visita."""
+        if self.navegador.es_actual("agenda"):
+            self.cargar_citas_del_dia()
 
     def crear_boton_menu(self, texto, color_base):
         btn = QPushButton(texto)
@@ -185,62 +181,104 @@ class MainView(QMainWindow):
         """)
         return btn
 
-    def iniciar_scraping_bcv(self):
-        """Inicia el hilo para buscar el precio del dólar."""
-        self.worker_bcv = BCVWorker()
-        self.worker_bcv.precio_actualizado.connect(self.actualizar_tasa_ui)
-        self.worker_bcv.error_ocurrido.connect(self.manejar_error_bcv)
-        self.worker_bcv.start()
+    def cargar_tasa_bcv(self):
+        """Muestra al instante la última tasa guardada y deja al servicio BCV a cargo de renovarla."""
+        guardada = TasaController().tasa_guardada()
+        if guardada:
+            self.tasa_bcv_actual = guardada.valor
+            self._mostrar_tasa(guardada.valor, guardada.actualizada if guardada.vieja else None)
+        if guardada is None or guardada.vieja:
+            self.iniciar_servicio_bcv()
+        else:
+            # La tasa está vigente: requests no hace falta para el arranque
+            QTimer.singleShot(DEMORA_SERVICIO_BCV_MS, self.iniciar_servicio_bcv)
+
+    def iniciar_servicio_bcv(self):
+        """Arranca el hilo que consulta el BCV cada vez que vence la tasa, durante toda la sesión."""
+        if self.servicio_bcv is not None:
+            return
+        # Importación diferida: requests solo hace falta para ir a la red
+        from controllers.bcv_controller import ServicioTasaBCV
+        self.servicio_bcv = ServicioTasaBCV(parent=self)
+        self.servicio_bcv.precio_actualizado.connect(self.actualizar_tasa_ui)
+        self.servicio_bcv.error_ocurrido.connect(self.manejar_error_bcv)
+        self.servicio_bcv.start()
+
+    def detener_servicio_bcv(self):
+        """Antes de que main.py cierre el pool de conexiones."""
+        if self.servicio_bcv is not None:
+            self.servicio_bcv.detener()
+            # Soltar un QThread que sigue corriendo aborta el proceso
+            if self.servicio_bcv.isFinished():
+                self.servicio_bcv = None
+
+    def closeEvent(self, event):
+        self.detener_servicio_bcv()
+        super().closeEvent(event)
 
     def actualizar_tasa_ui(self, precio):
-        """Se ejecuta cuando el hilo termina con éxito."""
+        """Se ejecuta con cada consulta buena del servicio."""
         self.tasa_bcv_actual = precio
-        self.lbl_tasa.setText(f"BCV: {precio:.2f} Bs/$")
+        self._mostrar_tasa(precio)
 
     def manejar_error_bcv(self, mensaje):
-        """Se ejecuta si el hilo falla."""
-        self.lbl_tasa.setText("BCV: Error")
+        """Se ejecuta si el hilo falla: se sigue usando la tasa guardada, marcada como vieja."""
         print(f"Error scraping BCV: {mensaje}")
+        guardada = TasaController().tasa_guardada()
+        if guardada:
+            self._mostrar_tasa(guardada.valor, guardada.actualizada)
+        else:
+            self.lbl_tasa.setText("BCV: Error")
+
+    def _mostrar_tasa(self, precio, vieja_desde=None):
+        """vieja_desde: datetime de la tasa guardada en uso si ya no está vigente."""
+        if vieja_desde is None:
+            self.lbl_tasa.setText(f"BCV: {precio:.2f} Bs/$")
+            self.lbl_tasa.setStyleSheet("color: #F1C40F; margin-bottom: 20px;")
+            self.lbl_tasa.setToolTip("")
+        else:
+            self.lbl_tasa.setText(f"BCV: {precio:.2f} Bs/$ ⚠️\n(del {vieja_desde:%d/%m %H:%M})")
+            self.lbl_tasa.setStyleSheet("color: #E67E22; margin-bottom: 20px;")
+            self.lbl_tasa.setToolTip("Tasa guardada: no se pudo actualizar desde el BCV todavía.")
 
     def cargar_citas_del_dia(self):
+        """Consulta la agenda en segundo plano; un cambio de fecha descarta la anterior."""
+        fecha_str = self.date_selector.date().toString("yyyy-MM-dd")
+        self.navegador.marcar_cargada("agenda")
+        citas = self.controller.citas_en_cache(fecha_str)
+        if citas is not None:
+            # Día ya visto y sin cambios: se pinta sin pasar por el pool
+            self.tareas.cancelar("agenda")
+            self._mostrar_citas(citas)
+            self._precargar_vecinos()
+            return
+        self.tareas.ejecutar(
+            "agenda", self.controller.obtener_citas_por_fecha, fecha_str,
+            al_terminar=self._citas_cargadas,
+        )
+
+    def _citas_cargadas(self, citas):
+        self._mostrar_citas(citas)
+        self._precargar_vecinos()
+
+    def _precargar_vecinos(self):
+        """Deja listos en cache el día anterior y el siguiente al mostrado."""
         fecha_str = self.date_selector.date().toString("yyyy-MM-dd")
-        citas = self.controller.obtener_citas_por_fecha(fecha_str)
-        self.tabla_citas.setRowCount(0)
-        for row_idx, cita in enumerate(citas):
-            id_cita = cita[0]
-            self.tabla_citas.insertRow(row_idx)
-            item_inicio = QTableWidgetItem(cita[1])
-            item_inicio.setData(Qt.ItemDataRole.UserRole, id_cita)
-            self.tabla_citas.setItem(row_idx, 0, item_inicio)
-            self.tabla_citas.setItem(row_idx, 1, QTableWidgetItem(cita[2]))
-            item_barbero = QTableWidgetItem(f"✂️ {cita[3]}")
-            item_barbero.setFont(QFont("Arial", 10, QFont.Bold))
-            self.tabla_citas.setItem(row_idx, 2, item_barbero)
-            self.tabla_citas.setItem(row_idx, 3, QTableWidgetItem(cita[4]))
-            self.tabla_citas.setItem(row_idx, 4, QTableWidgetItem(cita[5]))
-            precio_item = QTableWidgetItem(f"${cita[6]:.2f}")
-            precio_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.tabla_citas.setItem(row_idx, 5, precio_item)
-            estado = cita[7]
-            item_estado = QTableWidgetItem(estado)
-            item_estado.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            if estado == 'Pendiente': item_estado.setForeground(QColor('#FF8C00'))
-            elif estado == 'Pagada': item_estado.setForeground(QColor('green'))
-            elif estado == 'Cancelada': item_estado.setForeground(QColor('red'))
-            font = item_estado.font()
-            font.setBold(True)
-            item_estado.setFont(font)
-            self.tabla_citas.setItem(row_idx, 6, item_estado)
+        self.tareas.ejecutar("agenda_vecinos", self.controller.precargar_dias_vecinos, fecha_str)
+
+    def _mostrar_citas(self, citas):
+        # Diff por id_cita: solo se repintan las filas que cambiaron
+        self.modelo_citas.actualizar(citas)
+        linea_de_tiempo.marcar("primera_agenda")
 
     def mostrar_menu_contextual(self, pos):
         index = self.tabla_citas.indexAt(pos)
         if not index.isValid(): return
         fila = index.row()
-        self.tabla_citas.setCurrentCell(fila, index.column())
-        item_inicio = self.tabla_citas.item(fila, 0)
-        id_cita = item_inicio.data(Qt.ItemDataRole.UserRole)
-        cliente = self.tabla_citas.item(fila, 3).text()
-        estado = self.tabla_citas.item(fila, 6).text()
+        self.tabla_citas.setCurrentIndex(index)
+        id_cita = self.modelo_citas.id_cita(fila)
+        cliente = self.modelo_citas.cliente(fila)
+        estado = self.modelo_citas.estado(fila)
         menu = QMenu()
 
         if cliente == "Público General":
@@ -260,22 +298,19 @@ class MainView(QMainWindow):
             self.cargar_citas_del_dia()
 
     def cancelar_cita_seleccionada(self):
-        fila = self.tabla_citas.currentRow()
-        if fila < 0: return
-        item_inicio = self.tabla_citas.item(fila, 0)
-        # CORRECCIÓN: Usar Qt.ItemDataRole.UserRole para consistencia
-        id_cita = item_inicio.data(Qt.ItemDataRole.UserRole)
-        cliente = self.tabla_citas.item(fila, 3).text()
+        index = self.tabla_citas.currentIndex()
+        if not index.isValid(): return
+        fila = index.row()
+        id_cita = self.modelo_citas.id_cita(fila)
+        cliente = self.modelo_citas.cliente(fila)
         confirmacion = QMessageBox.question(self, "Confirmar Cancelación", f"¿Está seguro de CANCELAR la cita de {cliente}?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if confirmacion == QMessageBox.StandardButton.Yes:
             exito, mensaje = self.controller.cancelar_cita(id_cita)
             if exito: self.cargar_citas_del_dia()
 
-    def abrir_cobro(self, row, col):
-        item_inicio = self.tabla_citas.item(row, 0)
-        id_cita = item_inicio.data(Qt.ItemDataRole.UserRole)
-        item_estado = self.tabla_citas.item(row, 6)
-        if item_estado.text() in ['Pagada', 'Cancelada']: return
+    def abrir_cobro(self, index):
+        id_cita = self.modelo_citas.id_cita(index.row())
+        if self.modelo_citas.estado(index.row()) in ['Pagada', 'Cancelada']: return
         
         # Pasamos la tasa BCV vigente al modal de pago
         ventana_pago = PagoView(id_cita, tasa_bcv=self.tasa_bcv_actual, parent=self)
@@ -285,12 +320,12 @@ class MainView(QMainWindow):
     def abrir_cita_express(self):
         dialogo = CitaExpressView(self)
         dialogo.exec()
-        self.cargar_citas_del_dia()
+        self._refrescar_agenda()
 
     def abrir_nueva_cita(self):
         dialogo = AgendarCitaView(self)
         dialogo.exec() 
-        self.cargar_citas_del_dia()
+        self._refrescar_agenda()
 
     def abrir_clientes(self):
         view = ClientesView(self)
@@ -301,9 +336,11 @@ class MainView(QMainWindow):
         view.exec()
     
     def abrir_cierre_caja(self):
+        from views.cierre_caja_view import CierreCajaView
         view = CierreCajaView(self)
         view.exec()
     
     def abrir_comisiones(self):
+        from views.reporte_comisiones_view import ReporteComisionesView
         view = ReporteComisionesView(self)
         view.exec()
\ No newline at end of file
@@ -0,0 +1,133 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from views.estilos_tabla import (
+    ALINEADO_CENTRO, ALINEADO_DERECHA, COLOR_ESTADO, FUENTE_BARBERO, FUENTE_ESTADO,
+)
+
+
+class ModeloAgenda(QAbstractTableModel):
+    """
+    Citas del día para la tabla de la agenda.
+
+    actualizar() compara por id_cita contra lo que ya se muestra y emite
+    solo rowsRemoved / rowsInserted / dataChanged de las filas que cambian,
+    así la selección y el scroll sobreviven a cada refresco.
+    """
+
+    COLUMNAS = ["Inicio", "Fin", "Barbero", "Cliente", "Servicio", "Precio ($)", "Estado"]
+    COL_CLIENTE = 3
+    COL_ESTADO = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._citas = []   # Filas tal como las entrega CitasController
+        self._textos = []  # Textos ya formateados, en paralelo a _citas
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._citas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, index, rol=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        fila, col = index.row(), index.column()
+        if rol == Qt.ItemDataRole.DisplayRole:
+            return self._textos[fila][col]
+        if rol == Qt.ItemDataRole.UserRole:
+            return self._citas[fila][0]
+        if rol == Qt.ItemDataRole.FontRole:
+            if col == 2:
+                return FUENTE_BARBERO
+            if col == self.COL_ESTADO:
+                return FUENTE_ESTADO
+        elif rol == Qt.ItemDataRole.ForegroundRole:
+            if col == self.COL_ESTADO:
+                return COLOR_ESTADO.get(self._citas[fila][7])
+        elif rol == Qt.ItemDataRole.TextAlignmentRole:
+            if col == 5:
+                return ALINEADO_DERECHA
+            if col == self.COL_ESTADO:
+                return ALINEADO_CENTRO
+        return None
+
+    # --- Acceso para la vista ---
+
+    def id_cita(self, fila):
+        return self._citas[fila][0]
+
+    def cliente(self, fila):
+        return self._citas[fila][4]
+
+    def estado(self, fila):
+        return self._citas[fila][7]
+
+    # --- Diff ---
+
+    def actualizar(self, citas):
+        """Lleva el modelo a `citas` (ordenadas) tocando solo las filas distintas."""
+        nuevas_ids = {cita[0] for cita in citas}
+
+        # 1) Quitar las que ya no están, en bloques contiguos de abajo hacia arriba
+        fila = len(self._citas) - 1
+        while fila >= 0:
+            if self._citas[fila][0] in nuevas_ids:
+                fila -= 1
+                continue
+            fin = fila
+            while fila >= 0 and self._citas[fila][0] not in nuevas_ids:
+                fila -= 1
+            self._quitar(fila + 1, fin)
+
+        # 2) Recorrer las nuevas en orden: igual -> quizá dataChanged, si no insertar
+        posicion = 0
+        while posicion < len(citas):
+            cita = citas[posicion]
+            if posicion < len(self._citas) and self._citas[posicion][0] == cita[0]:
+                if self._citas[posicion] != cita:
+                    self._citas[posicion] = cita
+                    self._textos[posicion] = self._formatear(cita)
+                    self.dataChanged.emit(
+                        self.index(posicion, 0), self.index(posicion, len(self.COLUMNAS) - 1)
+                    )
+                posicion += 1
+                continue
+
+            # Si la cita ya estaba más abajo (cambió de hora), se saca de ahí
+            presentes = {c[0]: i for i, c in enumerate(self._citas[posicion:], posicion)}
+            if cita[0] in presentes:
+                anterior = presentes[cita[0]]
+                self._quitar(anterior, anterior)
+
+            # Bloque de nuevas consecutivas que no están en la tabla
+            bloque = [cita]
+            siguiente = posicion + 1
+            while siguiente < len(citas) and citas[siguiente][0] not in presentes:
+                bloque.append(citas[siguiente])
+                siguiente += 1
+            self._insertar(posicion, bloque)
+            posicion += len(bloque)
+
+    def _quitar(self, desde, hasta):
+        self.beginRemoveRows(QModelIndex(), desde, hasta)
+        del self._citas[desde:hasta + 1]
+        del self._textos[desde:hasta + 1]
+        self.endRemoveRows()
+
+    def _insertar(self, posicion, citas):
+        self.beginInsertRows(QModelIndex(), posicion, posicion + len(citas) - 1)
+        self._citas[posicion:posicion] = citas
+        self._textos[posicion:posicion] = [self._formatear(cita) for cita in citas]
+        self.endInsertRows()
+
+    @staticmethod
+    def _formatear(cita):
+        return (cita[1], cita[2], f"✂️ {cita[3]}", cita[4], cita[5], f"${cita[6]:.2f}", cita[7])
@@ -0,0 +1,86 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from controllers.clientes_controller import ClientesController, TAMANO_PAGINA
+
+
+class ModeloClientes(QAbstractTableModel):
+    """
+    Clientes para tablas, cargados por páginas a medida que la
+    vista baja (canFetchMore / fetchMore). Cada página se pide después de
+    la última fila cargada, así abrir la lista cuesta lo mismo con 100 que
+    con 100k clientes y solo vive en memoria lo que se llegó a ver.
+
+    mostrar_resultados() reemplaza la lista por un resultado de búsqueda
+    (ya limitado) y deja de paginar hasta el próximo listar().
+    """
+
+    COLUMNAS = ["ID", "Nombre", "Teléfono", "Email"]
+    COL_NOMBRE = 1
+
+    def __init__(self, controller=None, excluir_nombre=None, tamano_pagina=TAMANO_PAGINA, parent=None):
+        super().__init__(parent)
+        self.controller = controller or ClientesController()
+        self.excluir_nombre = excluir_nombre
+        self.tamano_pagina = tamano_pagina
+        self._clientes = []      # Filas (id_cliente, nombre, telefono, email)
+        self._paginando = False  # Listado completo con más páginas por pedir
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._clientes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, index, rol=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        cliente = self._clientes[index.row()]
+        if rol in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            valor = cliente[index.column()]
+            return "" if valor is None else str(valor)
+        if rol == Qt.ItemDataRole.UserRole:
+            return cliente[0]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._paginando
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._paginando:
+            return
+        ultima = self._clientes[-1] if self._clientes else None
+        pagina = self.controller.listar_pagina(ultima, self.tamano_pagina, self.excluir_nombre)
+        if len(pagina) < self.tamano_pagina:
+            self._paginando = False
+        if pagina:
+            self.beginInsertRows(QModelIndex(), len(self._clientes), len(self._clientes) + len(pagina) - 1)
+            self._clientes.extend(pagina)
+            self.endInsertRows()
+
+    # --- Carga ---
+
+    def listar(self):
+        """Vuelve al listado completo por nombre, con solo la primera página cargada."""
+        self.beginResetModel()
+        self._clientes = []
+        self._paginando = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def mostrar_resultados(self, clientes):
+        self.beginResetModel()
+        self._clientes = [c for c in clientes if self.excluir_nombre is None or c[1] != self.excluir_nombre]
+        self._paginando = False
+        self.endResetModel()
+
+    # --- Acceso para la vista ---
+
+    def cliente(self, fila):
+        return self._clientes[fila]
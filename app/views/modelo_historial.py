@@ -0,0 +1,80 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from controllers.clientes_controller import ClientesController, TAMANO_PAGINA_HISTORIAL
+from views.estilos_tabla import (
+    ALINEADO_CENTRO, ALINEADO_DERECHA, COLOR_ESTADO, FUENTE_BARBERO, FUENTE_ESTADO,
+)
+
+
+class ModeloHistorial(QAbstractTableModel):
+    """
+    Historial de un cliente, de la cita más reciente a la más vieja, pedido
+    por páginas (canFetchMore / fetchMore) a medida que la tabla baja: un
+    cliente con años de visitas abre igual de rápido que uno nuevo.
+    """
+
+    COLUMNAS = ["Fecha", "Hora", "Servicio", "Barbero", "Precio", "Estado"]
+    COL_BARBERO = 3
+    COL_PRECIO = 4
+    COL_ESTADO = 5
+
+    def __init__(self, id_cliente, controller=None, tamano_pagina=TAMANO_PAGINA_HISTORIAL, parent=None):
+        super().__init__(parent)
+        self.id_cliente = id_cliente
+        self.controller = controller or ClientesController()
+        self.tamano_pagina = tamano_pagina
+        self._citas = []
+        self._quedan = True
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._citas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.ItemDataRole.DisplayRole):
+        if orientacion == Qt.Orientation.Horizontal and rol == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, index, rol=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        cita, col = self._citas[index.row()], index.column()
+        if rol == Qt.ItemDataRole.DisplayRole:
+            if col == self.COL_BARBERO:
+                return f"✂️ {cita[3]}"
+            if col == self.COL_PRECIO:
+                return f"${cita[4]:.2f}"
+            return cita[col]
+        if rol == Qt.ItemDataRole.FontRole:
+            if col == self.COL_BARBERO:
+                return FUENTE_BARBERO
+            if col == self.COL_ESTADO:
+                return FUENTE_ESTADO
+        elif rol == Qt.ItemDataRole.ForegroundRole:
+            if col == self.COL_ESTADO:
+                return COLOR_ESTADO.get(cita[5])
+        elif rol == Qt.ItemDataRole.TextAlignmentRole:
+            if col == self.COL_PRECIO:
+                return ALINEADO_DERECHA
+            if col == self.COL_ESTADO:
+                return ALINEADO_CENTRO
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._quedan
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._quedan:
+            return
+        ultima = self._citas[-1] if self._citas else None
+        pagina = self.controller.obtener_historial_cliente(self.id_cliente, ultima, self.tamano_pagina)
+        if len(pagina) < self.tamano_pagina:
+            self._quedan = False
+        if pagina:
+            self.beginInsertRows(QModelIndex(), len(self._citas), len(self._citas) + len(pagina) - 1)
+            self._citas.extend(pagina)
+            self.endInsertRows()
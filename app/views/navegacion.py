@@ -0,0 +1,69 @@
+import time
+
+from PySide6.QtWidgets import QStackedWidget
+
+from database import DatabaseManager
+
+
+class Navegador(QStackedWidget):
+    """
+    Pantallas del menú lateral apiladas: cada una se construye la primera
+    vez que se muestra y después solo se oculta. Al volver a ella se
+    refresca únicamente si sus datos están viejos (hubo escrituras desde
+    la última carga o pasó su vigencia).
+    """
+
+    VIGENCIA_S = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pantallas = {}
+
+    def registrar(self, nombre, fabrica, refrescar, vigencia_s=None):
+        """fabrica() crea el widget (y hace su primera carga); refrescar(widget) recarga sus datos."""
+        self._pantallas[nombre] = {
+            "fabrica": fabrica,
+            "refrescar": refrescar,
+            "vigencia_s": self.VIGENCIA_S if vigencia_s is None else vigencia_s,
+            "widget": None,
+            "escrituras": None,
+            "cargada_en": 0.0,
+        }
+
+    def mostrar(self, nombre):
+        pantalla = self._pantallas[nombre]
+        if pantalla["widget"] is None:
+            pantalla["widget"] = pantalla["fabrica"]()
+            self.addWidget(pantalla["widget"])
+            self._marcar_cargada(pantalla)
+        elif self._esta_vieja(pantalla):
+            pantalla["refrescar"](pantalla["widget"])
+            self._marcar_cargada(pantalla)
+        self.setCurrentWidget(pantalla["widget"])
+        return pantalla["widget"]
+
+    def es_actual(self, nombre):
+        widget = self._pantallas[nombre]["widget"]
+        return widget is not None and self.currentWidget() is widget
+
+    def marcar_cargada(self, nombre):
+        """La pantalla acaba de recargarse por su cuenta (p. ej. tras cerrar un diálogo)."""
+        pantalla = self._pantallas[nombre]
+        if pantalla["widget"] is not None:
+            self._marcar_cargada(pantalla)
+
+    def marcar_vieja(self, nombre=None):
+        """Fuerza el refresco en la próxima visita (de una pantalla o de todas)."""
+        pantallas = [self._pantallas[nombre]] if nombre else self._pantallas.values()
+        for pantalla in pantallas:
+            pantalla["escrituras"] = None
+
+    def _marcar_cargada(self, pantalla):
+        pantalla["escrituras"] = DatabaseManager.contador_escrituras()
+        pantalla["cargada_en"] = time.monotonic()
+
+    @staticmethod
+    def _esta_vieja(pantalla):
+        if pantalla["escrituras"] != DatabaseManager.contador_escrituras():
+            return True
+        return time.monotonic() - pantalla["cargada_en"] > pantalla["vigencia_s"]
@@ -150,7 +150,8 @@ class DesglosePagoDialog(QDialog):
             'metodo': metodo,
             'monto': monto_ingresado,
             'monto_usd': monto_usd,
-            'referencia': referencia
+            'referencia': referencia,
+            'es_bolivares': es_bolivares,
         }
         self.pagos.append(pago)
 
@@ -533,6 +534,18 @@ class PagoView(QDialog):
                 "color: #E74C3C; background-color: #1F2A35; padding: 10px; border-radius: 5px; font-weight: bold; font-size: 14px;"
             )
 
+    def _bolivares_recibidos(self):
+        """Bs que entran a caja por este cobro (sin el vuelto); 0 si se pagó en divisas."""
+        if self.METODO_MIXTO in self.combo_metodo.currentText():
+            recibido = sum(pago['monto'] for pago in self.pagos_mixtos if pago['es_bolivares'])
+        elif 'Bs' in self.combo_moneda_recibida.currentText() or 'Bolívares' in self.combo_moneda_recibida.currentText():
+            recibido = float(self.input_monto_recibido.text() or 0)
+        else:
+            return 0.0
+        if self.tasa_bcv and self.tasa_bcv > 0:
+            recibido = min(recibido, self.monto_a_cobrar * self.tasa_bcv)
+        return round(recibido, 2)
+
     def procesar_pago(self):
         metodo = self.combo_metodo.currentText()
         referencia = self.input_referencia.text().strip()
@@ -586,7 +599,10 @@ class PagoView(QDialog):
         )
 
         if confirmacion == QMessageBox.Yes:
-            exito = self.controller.registrar_pago(self.id_cita, self.monto_a_cobrar, metodo, referencia)
+            exito = self.controller.registrar_pago(
+                self.id_cita, self.monto_a_cobrar, metodo, referencia,
+                tasa_bcv=self.tasa_bcv, monto_bs=self._bolivares_recibidos(),
+            )
             
             if exito:
                 QMessageBox.information(self, "Pago Exitoso", "El pago ha sido registrado correctamente.")
@@ -1,5 +1,4 @@
 from PySide6.QtWidgets import (
-    QComboBox,
     QDialog,
     QDialogButtonBox,
     QGridLayout,
@@ -9,7 +8,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 
 from controllers.citas_controller import CitasController
-from controllers.clientes_controller import ClientesController
+from views.selector_cliente import SelectorCliente
 
 
 class ReasignarClienteView(QDialog):
@@ -20,10 +19,8 @@ class ReasignarClienteView(QDialog):
         self.setModal(True)
 
         self.citas_controller = CitasController()
-        self.clientes_controller = ClientesController()
 
         self._setup_ui()
-        self._cargar_clientes()
 
     def _setup_ui(self):
         layout = QGridLayout(self)
@@ -32,15 +29,15 @@ class ReasignarClienteView(QDialog):
         titulo.setStyleSheet("color: #e0e0e0; font-size: 16px; font-weight: 600;")
         layout.addWidget(titulo, 0, 0, 1, 2)
 
-        self.clientes_combo = QComboBox()
-        self.clientes_combo.setEditable(True)
-        self.clientes_combo.setStyleSheet(
-            """
-            QComboBox { background-color: #2d2d2d; color: #e0e0e0; padding: 6px; }
-            QComboBox QAbstractItemView { background-color: #1e1e1e; color: #e0e0e0; }
-            """
+        # Se busca escribiendo (FTS en la BD): no hay que recorrer la lista completa
+        self.selector_cliente = SelectorCliente(excluir_nombre="Público General")
+        self.selector_cliente.setStyleSheet(
+            "QLineEdit { background-color: #2d2d2d; color: #e0e0e0; padding: 6px; }"
         )
-        layout.addWidget(self.clientes_combo, 1, 0, 1, 2)
+        self.selector_cliente.completer.popup().setStyleSheet(
+            "background-color: #1e1e1e; color: #e0e0e0;"
+        )
+        layout.addWidget(self.selector_cliente, 1, 0, 1, 2)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         buttons.accepted.connect(self._confirmar)
@@ -56,23 +53,12 @@ class ReasignarClienteView(QDialog):
         self.setStyleSheet("background-color: #1e1e1e;")
         self.resize(380, 140)
 
-    def _cargar_clientes(self):
-        # Usa el listado general del controller de clientes
-        clientes = self.clientes_controller.listar_todos()
-        for cliente in clientes:
-            if cliente[1] == "Público General":
-                continue
-            # Guarda el id en item data para recuperar fácil
-            self.clientes_combo.addItem(cliente[1], cliente[0])
-        if self.clientes_combo.count():
-            self.clientes_combo.setCurrentIndex(0)
-
     def _confirmar(self):
-        if self.clientes_combo.currentIndex() < 0:
-            QMessageBox.warning(self, "Aviso", "Selecciona un cliente.")
+        nuevo_id = self.selector_cliente.resolver_cliente()
+        if not nuevo_id:
+            QMessageBox.warning(self, "Aviso", "Selecciona un cliente de la lista.")
             return
 
-        nuevo_id = self.clientes_combo.currentData()
         ok, msg = self.citas_controller.reasignar_cliente(self.id_cita, nuevo_id)
         if ok:
             QMessageBox.information(self, "Éxito", msg)
@@ -0,0 +1,108 @@
+from PySide6.QtWidgets import QCompleter, QLineEdit
+from PySide6.QtCore import Qt, QModelIndex, Signal
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+
+from controllers.clientes_controller import ClientesController
+from views.busqueda_clientes import BusquedaClientes
+
+_ROL_NOMBRE = Qt.ItemDataRole.UserRole + 1  # Lo que el completer escribe en el campo
+_ROL_ID = Qt.ItemDataRole.UserRole + 2
+
+
+class SelectorCliente(QLineEdit):
+    """
+    Campo para elegir un cliente escribiendo parte del nombre o teléfono.
+
+    El completer solo tiene las mejores coincidencias de buscar_clientes
+    (FTS, en segundo plano y con demora); con el campo vacío ofrece los
+    clientes de las últimas citas. Abrir el diálogo no depende de cuántos
+    clientes haya.
+    """
+    cliente_cambiado = Signal(object)  # id_cliente o None
+
+    SUGERENCIAS = 15
+
+    def __init__(self, excluir_nombre=None, parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText("Escriba nombre o teléfono...")
+        self.controller = ClientesController()
+        self.excluir_nombre = excluir_nombre
+        self._id_cliente = None
+
+        self.modelo = QStandardItemModel(self)
+        self.completer = QCompleter(self.modelo, self)
+        # El filtrado (sin acentos, por prefijo de cada palabra) ya lo hizo la BD
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCompletionRole(_ROL_NOMBRE)
+        self.completer.setMaxVisibleItems(10)
+        self.setCompleter(self.completer)
+        self.completer.activated[QModelIndex].connect(self._elegido)
+
+        self.busqueda = BusquedaClientes(self.controller, limite=self.SUGERENCIAS, parent=self)
+        self.busqueda.resultados.connect(self._mostrar_sugerencias)
+        self.textEdited.connect(self._texto_editado)
+
+    # --- API para los diálogos ---
+
+    def id_cliente(self):
+        return self._id_cliente
+
+    def resolver_cliente(self):
+        """
+        id del cliente elegido; si se escribió un nombre sin tomar una
+        sugerencia, el del único cliente que se llama exactamente así.
+        None si el campo está vacío, no hay coincidencia o es ambigua.
+        """
+        if self._id_cliente is None and self.text().strip():
+            clientes = self.controller.clientes_por_nombre(self.text())
+            if len(clientes) == 1 and clientes[0][1] != self.excluir_nombre:
+                self.establecer_cliente(clientes[0][0], clientes[0][1])
+        return self._id_cliente
+
+    def establecer_cliente(self, id_cliente, nombre):
+        self.setText(nombre or "")
+        self._cambiar_id(id_cliente)
+
+    # --- Interno ---
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        if not self.text().strip():
+            self._mostrar_recientes()
+
+    def _texto_editado(self, texto):
+        # Lo escrito ya no es el cliente elegido
+        self._cambiar_id(None)
+        if texto.strip():
+            self.busqueda.buscar(texto)
+        else:
+            self.busqueda.cancelar()
+            self._mostrar_recientes()
+
+    def _mostrar_recientes(self):
+        self._llenar(self.controller.clientes_recientes(excluir_nombre=self.excluir_nombre))
+
+    def _mostrar_sugerencias(self, texto, clientes):
+        if " ".join(self.text().split()) != texto or self._id_cliente is not None:
+            return
+        self._llenar([c for c in clientes if c[1] != self.excluir_nombre])
+
+    def _llenar(self, clientes):
+        self.modelo.clear()
+        for id_cliente, nombre, telefono, _email in clientes:
+            item = QStandardItem(f"{nombre}  ·  {telefono}" if telefono else nombre)
+            item.setData(nombre, _ROL_NOMBRE)
+            item.setData(id_cliente, _ROL_ID)
+            self.modelo.appendRow(item)
+        if clientes and self.hasFocus():
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
+
+    def _elegido(self, index):
+        self._cambiar_id(index.data(_ROL_ID))
+
+    def _cambiar_id(self, id_cliente):
+        if id_cliente != self._id_cliente:
+            self._id_cliente = id_cliente
+            self.cliente_cambiado.emit(id_cliente)